@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Check that the converters and validators take linear time on bad input.
+
+Each function is timed on adversarial inputs of two sizes, one four times
+as long as the other. Linear-time functions take about four times as long
+on the longer input and quadratic ones about sixteen times as long. The
+worst ratio of each function is reported.
+
+Run from the repository root:
+    python benchmarks/bench_adversarial.py [LENGTH]
+
+"""
+
+import sys
+import timeit
+
+from dragonmapper import hanzi, transcriptions
+
+# Functions that build adversarial inputs of about *n* characters.
+ADVERSARIAL_INPUTS = {
+    "latin letters": lambda n: "a" * n,
+    "latin words": lambda n: "abcxyz" * (n // 6),
+    "consonants": lambda n: "zh" * (n // 2),
+    "digits": lambda n: "1" * n,
+    "whitespace": lambda n: " " * n + "x",
+    "hanzi punctuation": lambda n: "。" * n,
+    "open brackets": lambda n: "(" * n,
+    "apostrophes": lambda n: "a'" * (n // 2),
+    "near-valid pinyin": lambda n: "zhuangzhuang" * (n // 12) + "x",
+    "near-valid accented": lambda n: "nǐhǎo" * (n // 5) + "q",
+    "near-valid numbered": lambda n: "ni3" * (n // 3) + "x",
+    "ambiguous syllables": lambda n: "nan" * (n // 3) + "!",
+    "bad tone": lambda n: "xi'an1" * (n // 6) + "ü9",
+    "pinyin variants": lambda n: "lv" * (n // 2),
+    "full-width pinyin": lambda n: "ｎｉ３" * (n // 3),
+    "near-valid zhuyin": lambda n: "ㄓㄨㄤ" * (n // 3) + "x",
+    "zhuyin marks": lambda n: "ˇ" * n,
+    "near-valid ipa": lambda n: "ʈʂ" * (n // 2) + "!",
+    "unknown ipa tones": lambda n: "ɕi˩" * (n // 3),
+    "ipa tone marks": lambda n: "˩" * n,
+    "hanzi": lambda n: "你" * n,
+    "spaced hanzi": lambda n: "你 " * (n // 2),
+    "spaced latin": lambda n: "a " * (n // 2) + "ɑ",
+}
+
+
+def _lenient(function):
+    def convert(s):
+        try:
+            return function(s)
+        except ValueError:
+            return None
+
+    return convert
+
+
+def _stream(s):
+    return list(
+        transcriptions.normalize_pinyin_stream(
+            s[i : i + 10] for i in range(0, len(s), 10)
+        )
+    )
+
+
+FUNCTIONS = {
+    "transcriptions.identify": transcriptions.identify,
+    "is_pinyin": transcriptions.is_pinyin,
+    "is_pinyin_compatible": transcriptions.is_pinyin_compatible,
+    "is_zhuyin": transcriptions.is_zhuyin,
+    "is_zhuyin_compatible": transcriptions.is_zhuyin_compatible,
+    "is_ipa": transcriptions.is_ipa,
+    "validate_pinyin": transcriptions.validate_pinyin,
+    "validate_zhuyin": transcriptions.validate_zhuyin,
+    "validate_ipa": transcriptions.validate_ipa,
+    "numbered_to_accented": _lenient(transcriptions.numbered_to_accented),
+    "accented_to_numbered": _lenient(transcriptions.accented_to_numbered),
+    "pinyin_to_zhuyin": _lenient(transcriptions.pinyin_to_zhuyin),
+    "pinyin_to_ipa": _lenient(transcriptions.pinyin_to_ipa),
+    "zhuyin_to_pinyin": _lenient(transcriptions.zhuyin_to_pinyin),
+    "zhuyin_to_ipa": _lenient(transcriptions.zhuyin_to_ipa),
+    "ipa_to_pinyin": _lenient(transcriptions.ipa_to_pinyin),
+    "ipa_to_zhuyin": _lenient(transcriptions.ipa_to_zhuyin),
+    "ipa_to_pinyin(keep)": lambda s: transcriptions.ipa_to_pinyin(s, errors="keep"),
+    "transcriptions.to_pinyin": _lenient(transcriptions.to_pinyin),
+    "transcriptions.to_zhuyin": _lenient(transcriptions.to_zhuyin),
+    "transcriptions.to_ipa": _lenient(transcriptions.to_ipa),
+    "normalize_pinyin": transcriptions.normalize_pinyin,
+    "normalize_pinyin_stream": _stream,
+    "hanzi.identify": hanzi.identify,
+    "hanzi.to_pinyin": _lenient(hanzi.to_pinyin),
+    "hanzi.to_zhuyin": _lenient(hanzi.to_zhuyin),
+    "hanzi.to_ipa": _lenient(hanzi.to_ipa),
+    "hanzi.to_pinyin(sandhi)": _lenient(lambda s: hanzi.to_pinyin(s, sandhi=True)),
+    "hanzi.to_lattice": hanzi.to_lattice,
+}
+
+
+def scaling_ratio(function, s, t):
+    """Return how many times longer *function* takes on *t* than on *s*."""
+    small = min(timeit.repeat(lambda: function(s), number=1, repeat=3))
+    large = min(timeit.repeat(lambda: function(t), number=1, repeat=3))
+    return large / max(small, 1e-6), large
+
+
+def main():
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print("{} and {} characters".format(length, 4 * length))
+    inputs = {
+        name: (make(length), make(4 * length))
+        for name, make in ADVERSARIAL_INPUTS.items()
+    }
+    for function_name, function in FUNCTIONS.items():
+        ratio, seconds, input_name = max(
+            scaling_ratio(function, s, t) + (name,) for name, (s, t) in inputs.items()
+        )
+        print(
+            "{:<26} {:5.1f}x  {:.3f}s  {}{}".format(
+                function_name,
+                ratio,
+                seconds,
+                input_name,
+                "  <- superlinear" if ratio > 8 else "",
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Benchmark converting titles with and without a :class:`ConversionCache`.
+
+Converts a list of short titles built from random CC-CEDICT words directly,
+into an empty cache, and again with every title cached, which is what a
+re-indexing run over unchanged titles does.
+
+Run from the repository root:
+    python benchmarks/bench_cache.py
+
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from dragonmapper import hanzi
+from dragonmapper.cache import ConversionCache
+
+
+def make_titles(size=100000, seed=0):
+    rng = random.Random(seed)
+    # Name readings with a middle dot can't be converted to Zhuyin.
+    words = [
+        word
+        for word, readings in hanzi._HANZI_PINYIN_MAP["words"].items()
+        if "·" not in readings[0]
+    ]
+    return ["".join(rng.sample(words, rng.randint(2, 5))) for _ in range(size)]
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    titles = make_titles()
+    print("{} titles".format(len(titles)))
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = os.path.join(tempdir, "cache.sqlite")
+        for system, function in (
+            ("pinyin", hanzi.to_pinyin),
+            ("zhuyin", hanzi.to_zhuyin),
+        ):
+            expected, direct = timed(lambda: [function(title) for title in titles])
+            with ConversionCache(path) as cache:
+                _, cold = timed(cache.convert, titles, system)
+            with ConversionCache(path) as cache:
+                result, warm = timed(cache.convert, titles, system)
+                assert result == expected and cache.misses == 0
+            print(
+                "{:<7} direct {:.2f}s, empty cache {:.2f}s, "
+                "warm cache {:.2f}s ({:.1f}x)".format(
+                    system, direct, cold, warm, direct / warm
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
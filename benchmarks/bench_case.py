@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Benchmark Pinyin conversion for input with different letter cases.
+
+Lowercase, uppercase, and title-case input is converted without remembering
+the case of each character. Each case is also timed while always remembering
+the case of each character, which is what mixed-case input still does.
+
+Run from the repository root:
+    python benchmarks/bench_case.py
+
+"""
+
+import timeit
+
+from dragonmapper import transcriptions
+
+SYLLABLES = [syllable + "3" for syllable in transcriptions._PINYIN_MAP]
+CASES = {
+    "lowercase": str.lower,
+    "uppercase": str.upper,
+    "title-case": str.capitalize,
+    "mixed-case": lambda s: s[:-2] + s[-2].upper() + s[-1],
+}
+
+
+def per_character_lower_case(s):
+    return s.lower(), [c.islower() for c in s]
+
+
+def bench(function, inputs, number=20):
+    seconds = min(
+        timeit.repeat(lambda: [function(s) for s in inputs], number=number, repeat=3)
+    )
+    return len(inputs) * number / seconds
+
+
+def run(label):
+    for name, case in CASES.items():
+        numbered = [case(syllable) for syllable in SYLLABLES]
+        accented = [transcriptions.numbered_syllable_to_accented(s) for s in numbered]
+        text = " ".join(numbered)
+        print(
+            "{:<16}{:<10}  numbered->accented {:>7.0f}/s  "
+            "accented->numbered {:>7.0f}/s  "
+            "numbered_to_accented {:>7.0f}/s".format(
+                label,
+                name,
+                bench(transcriptions.numbered_syllable_to_accented, numbered),
+                bench(transcriptions.accented_syllable_to_numbered, accented),
+                bench(transcriptions.numbered_to_accented, [text], number=3)
+                * len(numbered),
+            )
+        )
+
+
+def main():
+    run("")
+    lower_case = transcriptions._lower_case
+    transcriptions._lower_case = per_character_lower_case
+    try:
+        run("per-character ")
+    finally:
+        transcriptions._lower_case = lower_case
+
+
+if __name__ == "__main__":
+    main()
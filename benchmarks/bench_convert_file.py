@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Benchmark converting a large file with :func:`convert_file`.
+
+Writes a file of random CC-CEDICT words, one short sentence per line, and
+compares :func:`convert_file` to converting the file one line at a time with
+:func:`to_pinyin`.
+
+Run from the repository root:
+    python benchmarks/bench_convert_file.py [MEGABYTES]
+
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from dragonmapper import hanzi
+
+
+def write_corpus(path, megabytes, seed=0):
+    rng = random.Random(seed)
+    words = list(hanzi._HANZI_PINYIN_MAP["words"])
+    size = megabytes * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as f:
+        while f.tell() < size:
+            lines = (
+                " ".join(rng.choice(words) for _ in range(5)) + "。\n"
+                for _ in range(1000)
+            )
+            f.write("".join(lines))
+
+
+def convert_lines(input_path, output_path):
+    with (
+        open(input_path, encoding="utf-8") as f,
+        open(output_path, "w", encoding="utf-8") as output,
+    ):
+        for line in f:
+            output.write(hanzi.to_pinyin(line))
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as tempdir:
+        input_path = os.path.join(tempdir, "input.txt")
+        output_path = os.path.join(tempdir, "output.txt")
+        write_corpus(input_path, megabytes)
+        print("{} MB, {} CPUs".format(megabytes, os.cpu_count()))
+
+        started = time.perf_counter()
+        convert_lines(input_path, output_path)
+        baseline = time.perf_counter() - started
+        print("{:<20} {:.2f}s".format("line loop", baseline))
+        with open(output_path, "rb") as f:
+            expected = f.read()
+
+        for processes in sorted({1, os.cpu_count() or 1}):
+            started = time.perf_counter()
+            hanzi.convert_file(input_path, output_path, processes=processes)
+            elapsed = time.perf_counter() - started
+            with open(output_path, "rb") as f:
+                assert f.read() == expected
+            print(
+                "{:<20} {:.2f}s ({:.2f}x)".format(
+                    "convert_file({})".format(processes), elapsed, baseline / elapsed
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
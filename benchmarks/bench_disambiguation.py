@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the accuracy and speed of polyphone disambiguation.
+
+The words in CC-CEDICT are split into a training set that the collocation
+table is built from and a test set. Each polyphonic character in the test
+words is then read without the word's reading and compared with the reading
+it has in the word.
+
+Run from the repository root:
+    python benchmarks/bench_disambiguation.py
+
+"""
+
+import random
+import timeit
+
+from dragonmapper import hanzi
+
+TEST_FRACTION = 0.1
+
+
+def split_words(seed=0):
+    words = [
+        (word, readings)
+        for word, readings in hanzi._HANZI_PINYIN_MAP["words"].items()
+        if len(word) > 1
+    ]
+    random.Random(seed).shuffle(words)
+    test_size = int(len(words) * TEST_FRACTION)
+    return dict(words[test_size:]), dict(words[:test_size])
+
+
+def measure_accuracy(test_words):
+    characters = hanzi._HANZI_PINYIN_MAP["characters"]
+    total = default_correct = disambiguated_correct = 0
+    for word, readings in test_words.items():
+        syllables = hanzi._align_reading(word, readings[0], characters)
+        if syllables is None:
+            continue
+        for i, character in enumerate(word):
+            if len(characters[character]) == 1:
+                continue
+            default = characters[character][0]
+            total += 1
+            default_correct += default == syllables[i]
+            reading = hanzi._disambiguate(word, i, characters[character])
+            disambiguated_correct += reading == syllables[i]
+    return total, default_correct / total, disambiguated_correct / total
+
+
+def main():
+    train_words, test_words = split_words()
+    words = hanzi._HANZI_PINYIN_MAP["words"]
+    hanzi._HANZI_PINYIN_MAP["words"] = train_words
+    try:
+        hanzi._COLLOCATIONS = hanzi._load_collocations()
+    finally:
+        hanzi._HANZI_PINYIN_MAP["words"] = words
+
+    total, default, disambiguated = measure_accuracy(test_words)
+    print("Polyphonic characters tested: {}".format(total))
+    print("Accuracy (first reading):     {:.1%}".format(default))
+    print("Accuracy (disambiguated):     {:.1%}".format(disambiguated))
+
+    # Concatenated words usually aren't in the dictionary, so every character
+    # goes through the per-character path.
+    text = "".join(list(test_words)[:2000])
+    for disambiguate in (False, True):
+        seconds = min(
+            timeit.repeat(
+                lambda: hanzi.to_pinyin(text, disambiguate=disambiguate),
+                number=5,
+                repeat=3,
+            )
+        )
+        print(
+            "disambiguate={!s:<5}  {:.0f} characters/second".format(
+                disambiguate, len(text) * 5 / seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Benchmark cleaning a batch of Pinyin records that contains invalid syllables.
+
+A per-record loop that catches :exc:`ValueError` stops converting a record at
+its first bad syllable and loses the rest of it. ``errors='keep'`` converts
+every record in full, and :func:`validate_pinyin` reports every bad syllable.
+
+Run from the repository root:
+    python benchmarks/bench_errors.py
+
+"""
+
+import random
+import timeit
+
+from dragonmapper import transcriptions
+
+SYLLABLES = [syllable + "3" for syllable in transcriptions._PINYIN_MAP]
+INVALID = ["lv4", "Lve", "nv3"]
+
+
+def make_records(count, invalid_rate, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        record = rng.sample(SYLLABLES, 8)
+        if rng.random() < invalid_rate:
+            record[rng.randrange(len(record))] = rng.choice(INVALID)
+        records.append(" ".join(record))
+    return records
+
+
+def try_except(records):
+    converted = []
+    for record in records:
+        try:
+            converted.append(transcriptions.pinyin_to_zhuyin(record))
+        except ValueError:
+            converted.append(None)
+    return converted
+
+
+def lenient(records):
+    return [transcriptions.pinyin_to_zhuyin(r, errors="keep") for r in records]
+
+
+def validate(records):
+    return [transcriptions.validate_pinyin(r) for r in records]
+
+
+def bench(function, records, number=5):
+    seconds = min(timeit.repeat(lambda: function(records), number=number, repeat=3))
+    return len(records) * number / seconds
+
+
+def main():
+    for invalid_rate in (0.0, 0.1, 0.5):
+        records = make_records(2000, invalid_rate)
+        print(
+            "{:>4.0%} invalid  try/except {:>7.0f} records/s  "
+            "errors='keep' {:>7.0f} records/s  "
+            "validate_pinyin {:>7.0f} records/s".format(
+                invalid_rate,
+                bench(try_except, records),
+                bench(lenient, records),
+                bench(validate, records),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Benchmark identifying and converting Chinese characters in one pass.
+
+Compares calling :func:`dragonmapper.hanzi.identify` followed by
+:func:`dragonmapper.hanzi.to_pinyin` with
+:func:`dragonmapper.hanzi.identify_and_convert`.
+
+Run from the repository root:
+    python benchmarks/bench_identify.py
+
+"""
+
+import random
+import timeit
+
+from dragonmapper import hanzi
+
+
+def make_corpus(size=500, length=200, seed=0):
+    characters = list(hanzi._HANZI_PINYIN_MAP["characters"])[:5000]
+    rng = random.Random(seed)
+    return ["".join(rng.choices(characters, k=length)) for _ in range(size)]
+
+
+def separate(corpus):
+    return [(hanzi.identify(s), hanzi.to_pinyin(s)) for s in corpus]
+
+
+def fused(corpus):
+    return [hanzi.identify_and_convert(s) for s in corpus]
+
+
+def main():
+    corpus = make_corpus()
+    assert separate(corpus) == fused(corpus)
+    for name, function in (("identify + to_pinyin", separate), ("fused", fused)):
+        seconds = min(timeit.repeat(lambda: function(corpus), number=1, repeat=5))
+        print("{:<22}  {:.0f} documents/s".format(name, len(corpus) / seconds))
+
+
+if __name__ == "__main__":
+    main()
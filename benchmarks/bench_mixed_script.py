@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Benchmark converting mixed-script text with different amounts of Chinese.
+
+Each corpus mixes Chinese characters with Latin words, digits, and emoji.
+Conversion is timed with the character range table and with a pattern that
+matches every character, which looks up every character individually like
+before the range table was added.
+
+Run from the repository root:
+    python benchmarks/bench_mixed_script.py
+
+"""
+
+import random
+import re
+import timeit
+
+from dragonmapper import hanzi
+
+OTHER_TEXT = ["hello", "world", "2024", "lol", "\U0001f600", "#tag", "@user"]
+DENSITIES = (0.0, 0.1, 0.5, 0.9)
+
+
+def make_corpus(density, size=500, length=50, seed=0):
+    characters = list(hanzi._HANZI_PINYIN_MAP["characters"])[:5000]
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        parts = []
+        for _ in range(length):
+            if rng.random() < density:
+                parts.append(rng.choice(characters))
+            else:
+                parts.append(rng.choice(OTHER_TEXT))
+        corpus.append("".join(parts))
+    return corpus
+
+
+def bench(corpus):
+    seconds = min(
+        timeit.repeat(lambda: [hanzi.to_pinyin(s) for s in corpus], number=1, repeat=3)
+    )
+    return sum(map(len, corpus)) / seconds
+
+
+def main():
+    character_pattern = hanzi._CHARACTER_PATTERN
+    for density in DENSITIES:
+        corpus = make_corpus(density)
+        with_ranges = bench(corpus)
+        hanzi._CHARACTER_PATTERN = re.compile(".+", re.DOTALL)
+        try:
+            without_ranges = bench(corpus)
+        finally:
+            hanzi._CHARACTER_PATTERN = character_pattern
+        print(
+            "{:>4.0%} Chinese  {:>9.0f} chars/s with ranges, "
+            "{:>9.0f} chars/s per character".format(
+                density, with_ranges, without_ranges
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
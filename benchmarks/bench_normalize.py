@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Benchmark Pinyin normalization on clean and variant input.
+
+Times :func:`normalize_pinyin` on text that's already standard Pinyin and on
+text that uses the variants it normalizes, and compares it to the time taken
+by :func:`pinyin_to_zhuyin` on the same clean text.
+
+Run from the repository root:
+    python benchmarks/bench_normalize.py
+
+"""
+
+import random
+import timeit
+
+from dragonmapper import transcriptions
+
+FULL_WIDTH = {code_point - 0xFEE0: code_point for code_point in range(0xFF10, 0xFF5B)}
+
+
+def make_text(size=20000, seed=0):
+    rng = random.Random(seed)
+    syllables = list(transcriptions._PINYIN_MAP)
+    words = []
+    for _ in range(size // 2):
+        first, second = rng.choice(syllables), rng.choice(syllables)
+        if second[0] in "aeo":
+            second = "'" + second
+        words.append(first + rng.choice("12345") + second + rng.choice("12345"))
+    return " ".join(words)
+
+
+def make_variants(text):
+    text = text.replace("ü", "v").replace("lv", "lu:")
+    # Put the tone numbers of syllables ending in 'ng' on the vowel.
+    for vowel in "aeio":
+        for tone in "12345":
+            text = text.replace(vowel + "ng" + tone, vowel + tone + "ng")
+    return text.translate(FULL_WIDTH)[: len(text) // 2] + text[len(text) // 2 :]
+
+
+def bench(function, text):
+    return min(timeit.repeat(lambda: function(text), number=5, repeat=3)) / 5
+
+
+def main():
+    numbered = make_text()
+    accented = transcriptions.numbered_to_accented(numbered)
+    variants = make_variants(numbered)
+    assert transcriptions.normalize_pinyin(numbered) == numbered
+    assert transcriptions.normalize_pinyin(variants) == numbered
+    for name, text in (
+        ("clean numbered", numbered),
+        ("clean accented", accented),
+        ("variants", variants),
+    ):
+        normalize = bench(transcriptions.normalize_pinyin, text)
+        convert = bench(transcriptions.pinyin_to_zhuyin, numbered)
+        print(
+            "{:<15} normalize_pinyin {:>6.1f} ms  pinyin_to_zhuyin {:>6.1f} ms  "
+            "overhead {:>5.1%}".format(
+                name, normalize * 1000, convert * 1000, normalize / convert
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
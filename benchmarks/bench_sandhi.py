@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the cost of the *sandhi* option of the conversion functions.
+
+Times :func:`to_pinyin`, :func:`to_zhuyin`, and :func:`to_ipa` on segmented
+text built from random CC-CEDICT words with and without tone sandhi.
+
+Run from the repository root:
+    python benchmarks/bench_sandhi.py
+
+"""
+
+import random
+import timeit
+
+from dragonmapper import hanzi
+
+
+def make_text(size=20000, seed=0):
+    rng = random.Random(seed)
+    # Name readings with a middle dot can't be converted to Zhuyin or IPA.
+    words = [
+        word
+        for word, readings in hanzi._HANZI_PINYIN_MAP["words"].items()
+        if "·" not in readings[0]
+    ]
+    sentences = []
+    for _ in range(size // 10):
+        sentences.append(" ".join(rng.choice(words) for _ in range(5)) + "。")
+    return "".join(sentences)
+
+
+def main():
+    text = make_text()
+    for function in (hanzi.to_pinyin, hanzi.to_zhuyin, hanzi.to_ipa):
+        plain = min(timeit.repeat(lambda: function(text), number=1, repeat=5))
+        sandhi = min(
+            timeit.repeat(lambda: function(text, sandhi=True), number=1, repeat=5)
+        )
+        print(
+            "{:<10} {:.3f}s plain, {:.3f}s with sandhi ({:.2f}x)".format(
+                function.__name__, plain, sandhi, sandhi / plain
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the memory used by a pool of workers with shared dictionaries.
+
+Starts a number of worker processes that each convert some text and then
+report their memory usage while all of them are still running. Each pool is
+started with and without :func:`dragonmapper.hanzi.share_dictionaries`, using
+both the fork and spawn start methods.
+
+RSS counts shared pages once per process. PSS divides them between the
+processes that share them, so the total PSS is the pool's real memory use.
+This benchmark reads /proc and only runs on Linux.
+
+Run from the repository root:
+    python benchmarks/bench_shared_memory.py [WORKERS]
+
+"""
+
+import multiprocessing
+import sys
+import timeit
+
+TEXT = "我爱北京天安门。长江很长 黄河也很长。" * 50
+
+
+def memory_usage():
+    usage = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss"):
+                usage[name] = int(value.split()[0])
+    return usage["Rss"], usage["Pss"]
+
+
+def worker(results, done):
+    from dragonmapper import hanzi
+
+    seconds = min(timeit.repeat(lambda: hanzi.to_pinyin(TEXT), number=10, repeat=3))
+    results.put(memory_usage() + (seconds / 10,))
+    done.wait()
+
+
+def run_pool(start_method, shared, workers, output):
+    from dragonmapper import hanzi
+
+    if shared:
+        hanzi.share_dictionaries()
+    context = multiprocessing.get_context(start_method)
+    results, done = context.Queue(), context.Event()
+    processes = [
+        context.Process(target=worker, args=(results, done)) for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    usage = [results.get() for _ in processes]
+    parent_rss, parent_pss = memory_usage()
+    done.set()
+    for process in processes:
+        process.join()
+    output.put(
+        (
+            parent_rss + sum(rss for rss, pss, seconds in usage),
+            parent_pss + sum(pss for rss, pss, seconds in usage),
+            max(seconds for rss, pss, seconds in usage),
+        )
+    )
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    # Each pool runs in a fresh process, so that the pools don't affect each
+    # other.
+    context = multiprocessing.get_context("spawn")
+    for start_method in ("fork", "spawn"):
+        for shared in (False, True):
+            output = context.Queue()
+            pool = context.Process(
+                target=run_pool, args=(start_method, shared, workers, output)
+            )
+            pool.start()
+            rss, pss, seconds = output.get()
+            pool.join()
+            print(
+                "{:<5} {:<7} {} workers  total RSS {:>6.0f} MB  "
+                "total PSS {:>6.0f} MB  to_pinyin {:>5.1f} ms".format(
+                    start_method,
+                    "shared" if shared else "private",
+                    workers,
+                    rss / 1024,
+                    pss / 1024,
+                    seconds * 1000,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Benchmark converting Chinese characters using stored transcriptions.
+
+Converts a corpus of dictionary words to numbered Pinyin, Zhuyin, and IPA
+with and without :func:`dragonmapper.hanzi.load_transcriptions`, then
+measures how long precompiling each transcription system takes and how much
+memory it uses.
+
+Run from the repository root:
+    python benchmarks/bench_transcriptions.py
+
+"""
+
+import random
+import time
+import timeit
+import tracemalloc
+
+from dragonmapper import hanzi
+
+CONVERTERS = {
+    "numbered": lambda s: hanzi.to_pinyin(s, accented=False),
+    "zhuyin": hanzi.to_zhuyin,
+    "ipa": hanzi.to_ipa,
+}
+
+
+def make_corpus(size=2000, seed=0):
+    # Readings of names with a middle dot can't be converted to Zhuyin or IPA.
+    words = [
+        word
+        for word, readings in hanzi._HANZI_PINYIN_MAP["words"].items()
+        if "\u00b7" not in readings[0]
+    ]
+    rng = random.Random(seed)
+    return ["。".join(rng.sample(words, 5)) for _ in range(size)]
+
+
+def bench(function, corpus):
+    seconds = min(
+        timeit.repeat(lambda: [function(s) for s in corpus], number=1, repeat=3)
+    )
+    return len(corpus) / seconds
+
+
+def main():
+    corpus = make_corpus()
+    for system, function in CONVERTERS.items():
+        hanzi.unload_transcriptions()
+        before = bench(function, corpus)
+        hanzi.load_transcriptions([system])
+        after = bench(function, corpus)
+        print(
+            "{:<8}  {:>6.0f} texts/s without, {:>6.0f} texts/s with stored "
+            "transcriptions".format(system, before, after)
+        )
+
+    hanzi.unload_transcriptions()
+    for system in CONVERTERS:
+        tracemalloc.start()
+        start = time.perf_counter()
+        hanzi.load_transcriptions([system], precompile=True)
+        seconds = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(
+            "{:<8}  precompiled {} readings in {:.1f} s using {:.1f} MB".format(
+                system, len(hanzi._TRANSCRIPTIONS[system]), seconds, memory / 1e6
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
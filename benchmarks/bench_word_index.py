@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the compact word index against the built-in word dictionary.
+
+Measures how much memory each one uses and how long exact lookups, longest
+prefix lookups, and prefix scans take. The dictionary doesn't support prefix
+queries, so they're implemented with lookups of each prefix length and with
+a scan of all keys.
+
+Run from the repository root:
+    python benchmarks/bench_word_index.py
+
+"""
+
+import random
+import timeit
+import tracemalloc
+
+import dragonmapper.data
+from dragonmapper import hanzi
+
+
+def load_words():
+    lines = dragonmapper.data.load_data_file("hanzi_pinyin_words.tsv")
+    tracemalloc.start()
+    words = hanzi._parse_data(lines)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return words, size
+
+
+def dict_longest_prefix(words, max_length, s, start=0):
+    for end in range(min(len(s), start + max_length), start, -1):
+        readings = words.get(s[start:end])
+        if readings is not None:
+            return s[start:end], readings
+    return None, None
+
+
+def dict_iter_prefix(words, prefix):
+    return sorted(item for item in words.items() if item[0].startswith(prefix))
+
+
+def bench(function, inputs, number=3):
+    seconds = min(
+        timeit.repeat(lambda: [function(s) for s in inputs], number=number, repeat=3)
+    )
+    return seconds / number / len(inputs) * 1e6
+
+
+def main():
+    words, dict_size = load_words()
+    packed = hanzi._PackedDictionary.pack(words)
+    index = hanzi._PackedDictionary(packed)
+    print(
+        "memory  dict {:>6.1f} MB  index {:>6.1f} MB".format(
+            dict_size / 2**20, len(packed) / 2**20
+        )
+    )
+
+    rng = random.Random(0)
+    keys = rng.sample(list(words), 5000)
+    misses = [key + key[-1] for key in keys]
+    sentences = ["".join(rng.sample(keys, 3)) for _ in range(1000)]
+    prefixes = [key[0] for key in rng.sample(keys, 20)]
+    max_length = max(map(len, words))
+    for name, dict_function, index_function, inputs, number in (
+        ("get (hit)", words.get, index.get, keys, 3),
+        ("get (miss)", words.get, index.get, misses, 3),
+        (
+            "longest_prefix",
+            lambda s: dict_longest_prefix(words, max_length, s),
+            index.longest_prefix,
+            sentences,
+            3,
+        ),
+        (
+            "iter_prefix",
+            lambda s: dict_iter_prefix(words, s),
+            lambda s: list(index.iter_prefix(s)),
+            prefixes,
+            1,
+        ),
+    ):
+        print(
+            "{:<15} dict {:>9.2f} us  index {:>9.2f} us".format(
+                name,
+                bench(dict_function, inputs, number),
+                bench(index_function, inputs, number),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
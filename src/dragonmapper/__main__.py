@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""Run the conversion server or its load generator.
+
+See :mod:`dragonmapper.server`.
+
+"""
+
+from dragonmapper.server import main
+
+main()
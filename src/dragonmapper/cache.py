@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""A persistent cache of converted Chinese text.
+
+Converting the same text again, e.g. when a search index is rebuilt, only
+needs a lookup if the converted text was cached. The cache is a SQLite
+database keyed by a hash of the text, the conversion options, the
+transcriptions loaded with :func:`dragonmapper.hanzi.load_transcriptions`,
+and :func:`dragonmapper.hanzi.data_fingerprint`. When the fingerprint changes,
+the cached conversions are discarded.
+
+"""
+
+import hashlib
+import json
+import sqlite3
+
+from dragonmapper import hanzi
+
+_CONVERTERS = {
+    "pinyin": hanzi.to_pinyin,
+    "numbered": lambda s, **options: hanzi.to_pinyin(s, accented=False, **options),
+    "zhuyin": hanzi.to_zhuyin,
+    "ipa": hanzi.to_ipa,
+}
+
+# The options that can be given to the cached conversions and their defaults.
+_DEFAULT_OPTIONS = {
+    "delimiter": " ",
+    "all_readings": False,
+    "container": "[]",
+    "disambiguate": False,
+    "sandhi": False,
+}
+
+# SQLite's oldest versions allow 999 parameters in a statement.
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS conversions (
+    key BLOB PRIMARY KEY,
+    result TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class ConversionCache:
+    """A persistent cache of converted Chinese text.
+
+    *path* is the path of the SQLite database file. It's created if it
+    doesn't exist. ``':memory:'`` can be used for a cache that isn't saved.
+
+    *system* is ``'pinyin'`` (accented Pinyin), ``'numbered'`` (numbered
+    Pinyin), ``'zhuyin'``, or ``'ipa'``. *options* can be *delimiter*,
+    *all_readings*, *container*, *disambiguate*, and *sandhi*, which are the
+    same as :func:`dragonmapper.hanzi.to_pinyin`'s.
+
+    The *hits* and *misses* attributes count the texts that were and weren't
+    found in the cache.
+
+    """
+
+    def __init__(self, path):
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+        self._fingerprint = None
+        self._check_fingerprint()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def __len__(self):
+        self._check_fingerprint()
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM conversions")
+        return count[0]
+
+    def clear(self):
+        """Remove all cached conversions."""
+        with self._connection:
+            self._connection.execute("DELETE FROM conversions")
+
+    def _check_fingerprint(self):
+        """Discard the cached conversions if the conversion data changed."""
+        fingerprint = hanzi.data_fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+        stored = self._connection.execute(
+            "SELECT value FROM metadata WHERE name = 'fingerprint'"
+        ).fetchone()
+        if stored is None or stored[0] != fingerprint:
+            with self._connection:
+                self._connection.execute("DELETE FROM conversions")
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO metadata VALUES ('fingerprint', ?)",
+                    (fingerprint,),
+                )
+        self._fingerprint = fingerprint
+
+    def _keys(self, texts, system, options):
+        """Return the cache keys of *texts* converted with *options*."""
+        if system not in _CONVERTERS:
+            raise ValueError("Unknown transcription system: {}".format(system))
+        unknown = set(options).difference(_DEFAULT_OPTIONS)
+        if unknown:
+            raise TypeError("Unknown options: {}".format(", ".join(sorted(unknown))))
+        self._check_fingerprint()
+        # Stored transcriptions leave text that isn't Chinese unconverted, so
+        # they change the output too.
+        transcriptions = sorted(hanzi._TRANSCRIPTIONS)
+        prefix = json.dumps(
+            [
+                self._fingerprint,
+                system,
+                dict(_DEFAULT_OPTIONS, **options),
+                transcriptions,
+            ],
+            sort_keys=True,
+        ).encode("utf-8")
+        return [
+            hashlib.blake2b(prefix + text.encode("utf-8"), digest_size=16).digest()
+            for text in texts
+        ]
+
+    def get_many(self, texts, system="pinyin", **options):
+        """Return the cached conversions of *texts*.
+
+        A list is returned with an item for each text in *texts*: its
+        converted string, or ``None`` if it isn't in the cache.
+
+        """
+        texts = list(texts)
+        keys = self._keys(texts, system, options)
+        found = {}
+        execute = self._connection.execute
+        for i in range(0, len(keys), _BATCH_SIZE):
+            batch = keys[i : i + _BATCH_SIZE]
+            found.update(
+                execute(
+                    "SELECT key, result FROM conversions WHERE key IN ({})".format(
+                        ",".join("?" * len(batch))
+                    ),
+                    batch,
+                )
+            )
+        results = [found.get(key) for key in keys]
+        hits = len(results) - results.count(None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, texts, results, system="pinyin", **options):
+        """Store the conversions *results* of *texts* in the cache."""
+        texts, results = list(texts), list(results)
+        if len(texts) != len(results):
+            raise ValueError("texts and results must have the same length.")
+        keys = self._keys(texts, system, options)
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO conversions VALUES (?, ?)", zip(keys, results)
+            )
+
+    def convert(self, texts, system="pinyin", **options):
+        """Convert *texts*, using and updating the cache.
+
+        A list of converted strings is returned. Only the texts that aren't
+        in the cache are converted.
+
+        """
+        texts = list(texts)
+        results = self.get_many(texts, system, **options)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            convert = _CONVERTERS[system]
+            converted = {}
+            for i in missing:
+                text = texts[i]
+                if text not in converted:
+                    converted[text] = convert(text, **options)
+                results[i] = converted[text]
+            self.put_many(converted, converted.values(), system, **options)
+        return results
@@ -18,5 +18,14 @@ def load_data_file(filename, encoding="utf-8"):
         encoding: The file encoding. Defaults to utf-8.
 
     """
-    data = pkgutil.get_data(PACKAGE_NAME, os.path.join(DATA_DIR, filename))
-    return data.decode(encoding).splitlines()
+    return load_data_bytes(filename).decode(encoding).splitlines()
+
+
+def load_data_bytes(filename):
+    """Load a data file and return its contents as bytes.
+
+    Parameters:
+        filename: The name of the file (no directories included).
+
+    """
+    return pkgutil.get_data(PACKAGE_NAME, os.path.join(DATA_DIR, filename))
@@ -1,15 +1,33 @@
 # -*- coding: utf-8 -*-
 """Identification and transliteration functions for Chinese characters."""
 
+import atexit
+import functools
+import hashlib
+import heapq
+import json
+import mmap
+import os
 import re
+import warnings
+from array import array
+from collections import ChainMap, Counter, deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import resource_tracker, shared_memory
 
 import hanzidentifier
+import zhon.cedict
 import zhon.hanzi
 import zhon.pinyin
 
+import dragonmapper
 import dragonmapper.data
 from dragonmapper.transcriptions import (
+    accented_syllable_to_numbered,
     accented_to_numbered,
+    numbered_syllable_to_accented,
     pinyin_to_ipa,
     pinyin_to_zhuyin,
 )
@@ -26,53 +44,1022 @@ has_chinese = hanzidentifier.has_chinese
 
 _READING_SEPARATOR = "/"
 
+# The CC-CEDICT characters used by each character system.
+_TRADITIONAL_CHARACTERS = frozenset(zhon.cedict.traditional)
+_SIMPLIFIED_CHARACTERS = frozenset(zhon.cedict.simplified)
+_SHARED_CHARACTERS = _TRADITIONAL_CHARACTERS & _SIMPLIFIED_CHARACTERS
+_ALL_CHARACTERS = _TRADITIONAL_CHARACTERS | _SIMPLIFIED_CHARACTERS
 
-def _load_data():
-    """Load the word and character mapping data into a dictionary.
 
-    In the data files, each line is formatted like this:
+def _parse_data(lines):
+    """Parse lines of hanzi and readings into a dictionary.
+
+    Each line is formatted like this:
         HANZI   PINYIN_READING/PINYIN_READING
 
     So, lines need to be split by '\t' and then the Pinyin readings need to be
     split by '/'.
 
     """
+    # Split the lines by tabs: [[hanzi, pinyin]...].
+    lines = [line.split("\t") for line in lines if line]
+    # Make a dictionary: {hanzi: [pinyin, pinyin]...}.
+    return {hanzi: pinyin.split(_READING_SEPARATOR) for hanzi, pinyin in lines}
+
+
+class _PackedDictionary(Mapping):
+    """A read-only dictionary of readings stored in a flat buffer.
+
+    The buffer is created by :meth:`pack` and contains no Python objects, so
+    it can be shared between processes. It's laid out like this, where each
+    number is an unsigned 32-bit integer:
+        COUNT KEYS_SIZE VALUES_SIZE FIRST BUCKET_COUNT
+        BUCKETS[BUCKET_COUNT + 1] KEY_OFFSETS[COUNT + 1] VALUE_OFFSETS[COUNT + 1]
+        KEYS VALUES
+
+    KEYS holds the UTF-8 encoded keys in sorted order and VALUES holds each
+    key's readings separated by '/'. ``BUCKETS[i]`` is the index of the first
+    key that starts with a code point of at least ``FIRST + i``, so a lookup
+    only has to binary search the keys that start with the same character.
+    Readings are decoded each time they're looked up.
+
+    """
+
+    def __init__(self, buffer):
+        buffer = memoryview(buffer)
+        count, keys_size, values_size, first, bucket_count = buffer[:20].cast("I")
+        position = 20 + 4 * (bucket_count + 1 + 2 * (count + 1))
+        table = buffer[20:position].cast("I")
+        self._count = count
+        self._first = first
+        self._bucket_count = bucket_count
+        self._buckets = table[: bucket_count + 1]
+        self._key_offsets = table[bucket_count + 1 : bucket_count + count + 2]
+        self._value_offsets = table[bucket_count + count + 2 :]
+        self._keys = buffer[position : position + keys_size]
+        self._values = buffer[position + keys_size : position + keys_size + values_size]
+
+    @staticmethod
+    def pack(mapping):
+        """Pack a dictionary of readings into a :class:`bytes` buffer."""
+        keys, values = bytearray(), bytearray()
+        key_offsets, value_offsets = array("I", [0]), array("I", [0])
+        sorted_keys = sorted(mapping)
+        first = ord(sorted_keys[0][0]) if sorted_keys else 0
+        buckets = array("I")
+        for i, key in enumerate(sorted_keys):
+            while len(buckets) <= ord(key[0]) - first:
+                buckets.append(i)
+            keys += key.encode("utf-8")
+            values += _READING_SEPARATOR.join(mapping[key]).encode("utf-8")
+            key_offsets.append(len(keys))
+            value_offsets.append(len(values))
+        bucket_count = len(buckets)
+        buckets.append(len(sorted_keys))
+        header = array(
+            "I", [len(sorted_keys), len(keys), len(values), first, bucket_count]
+        )
+        return b"".join((header, buckets, key_offsets, value_offsets, keys, values))
+
+    def _key(self, i):
+        """Return the encoded key at index *i*."""
+        return self._keys[self._key_offsets[i] : self._key_offsets[i + 1]].tobytes()
+
+    def _bounds(self, character):
+        """Return the range of indexes of the keys that start with *character*."""
+        bucket = ord(character) - self._first
+        if not 0 <= bucket < self._bucket_count:
+            return 0, 0
+        return self._buckets[bucket], self._buckets[bucket + 1]
+
+    def _lower_bound(self, key, low, high):
+        """Return the index of the first key in a range that isn't less than *key*.
+
+        *key* is encoded. The index is *high* if all keys in the range are
+        less than *key*.
+
+        """
+        keys, key_offsets = self._keys, self._key_offsets
+        while low < high:
+            middle = (low + high) // 2
+            if keys[key_offsets[middle] : key_offsets[middle + 1]].tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, key):
+        """Return the index of *key*, or -1 if it isn't found."""
+        # This is the dictionaries' hot path, so _bounds() and _lower_bound()
+        # are inlined.
+        if not isinstance(key, str) or not key:
+            return -1
+        bucket = ord(key[0]) - self._first
+        if not 0 <= bucket < self._bucket_count:
+            return -1
+        low, end = self._buckets[bucket], self._buckets[bucket + 1]
+        high = end
+        key = key.encode("utf-8")
+        keys, key_offsets = self._keys, self._key_offsets
+        while low < high:
+            middle = (low + high) // 2
+            if keys[key_offsets[middle] : key_offsets[middle + 1]].tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < end and keys[key_offsets[low] : key_offsets[low + 1]] == key:
+            return low
+        return -1
+
+    def longest_prefix(self, s, start=0):
+        """Find the longest key that occurs in *s* at index *start*.
+
+        A tuple formatted like this is returned: (KEY, READINGS). If no key
+        occurs at *start*, ``(None, None)`` is returned.
+
+        """
+        if start >= len(s):
+            return None, None
+        low, high = self._bounds(s[start])
+        found = found_end = None
+        for end in range(start + 1, len(s) + 1):
+            prefix = s[start:end].encode("utf-8")
+            low = self._lower_bound(prefix, low, high)
+            if low == high:
+                break
+            key = self._key(low)
+            if key == prefix:
+                found, found_end = low, end
+            elif not key.startswith(prefix):
+                break
+        if found is None:
+            return None, None
+        return s[start:found_end], self._readings(found)
+
+    def iter_prefix(self, prefix):
+        """Yield the keys that start with *prefix* and their readings.
+
+        Tuples formatted like this are yielded in sorted order:
+        (KEY, READINGS).
+
+        """
+        if prefix:
+            low, high = self._bounds(prefix[0])
+            encoded_prefix = prefix.encode("utf-8")
+            low = self._lower_bound(encoded_prefix, low, high)
+        else:
+            low, high = 0, self._count
+            encoded_prefix = b""
+        for i in range(low, high):
+            key = self._key(i)
+            if not key.startswith(encoded_prefix):
+                break
+            yield str(key, "utf-8"), self._readings(i)
+
+    def _readings(self, i):
+        """Return the readings at index *i*."""
+        value = self._values[self._value_offsets[i] : self._value_offsets[i + 1]]
+        return str(value, "utf-8").split(_READING_SEPARATOR)
+
+    def get(self, key, default=None):
+        i = self._find(key)
+        return default if i < 0 else self._readings(i)
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._readings(i)
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield str(self._key(i), "utf-8")
+
+    def __len__(self):
+        return self._count
+
+    def release(self):
+        """Release the buffer. The dictionary can't be used afterward."""
+        for view in (
+            self._buckets,
+            self._key_offsets,
+            self._value_offsets,
+            self._keys,
+            self._values,
+        ):
+            view.release()
+
+
+# The environment variable that holds the name of the shared memory block
+# created by share_dictionaries().
+_SHARED_DICTIONARIES_VARIABLE = "DRAGONMAPPER_SHARED_DICTIONARIES"
+
+# The shared memory block the built-in dictionaries are stored in, if any.
+_SHARED_MEMORY = None
+
+
+def _unpack_dictionaries(buffer):
+    """Return the word and character dictionaries packed in *buffer*."""
+    buffer = memoryview(buffer)
+    (words_size,) = buffer[:4].cast("I")
+    return {
+        "words": _PackedDictionary(buffer[4 : 4 + words_size]),
+        "characters": _PackedDictionary(buffer[4 + words_size :]),
+    }
+
+
+def _close_shared_memory(block, owner=None):
+    """Close a shared memory block and remove it if this process is *owner*.
+
+    This is registered to run when the interpreter exits. *owner* is the ID
+    of the process that created the block. Forked children inherit the
+    registration, so they only close their own mapping. The block can't be
+    closed while the dictionaries still use it, so they're released first.
+
+    """
+    if block is _SHARED_MEMORY:
+        for dictionary in _HANZI_PINYIN_MAP.values():
+            if isinstance(dictionary, _PackedDictionary):
+                dictionary.release()
+    block.close()
+    if owner == os.getpid():
+        block.unlink()
+
+
+def _attach_shared_memory(name):
+    """Attach to an existing shared memory block without taking ownership."""
+    try:
+        block = shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers blocks with the resource tracker,
+        # which would remove the block when this process exits.
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            block = shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+    atexit.register(_close_shared_memory, block)
+    return block
+
+
+def _load_data():
+    """Load the word and character mapping data into a dictionary.
+
+    If the built-in dictionaries have been shared by another process with
+    :func:`share_dictionaries`, they're attached instead. If they can't be
+    attached, a warning is issued and the data files are loaded.
+
+    """
+    global _SHARED_MEMORY
+    name = os.environ.get(_SHARED_DICTIONARIES_VARIABLE)
+    if name:
+        try:
+            _SHARED_MEMORY = _attach_shared_memory(name)
+        except (OSError, ValueError) as e:
+            warnings.warn(
+                "Can't attach the shared dictionaries {!r}, loading the data "
+                "files instead: {}".format(name, e),
+                RuntimeWarning,
+            )
+        else:
+            return _unpack_dictionaries(_SHARED_MEMORY.buf)
     data = {}
     for name, file_name in (
         ("words", "hanzi_pinyin_words.tsv"),
         ("characters", "hanzi_pinyin_characters.tsv"),
     ):
-        # Split the lines by tabs: [[hanzi, pinyin]...].
-        lines = [
-            line.split("\t") for line in dragonmapper.data.load_data_file(file_name)
-        ]
-        # Make a dictionary: {hanzi: [pinyin, pinyin]...}.
-        data[name] = {hanzi: pinyin.split("/") for hanzi, pinyin in lines}
+        data[name] = _parse_data(dragonmapper.data.load_data_file(file_name))
     return data
 
 
 _HANZI_PINYIN_MAP = _load_data()
-_CHARACTERS = _HANZI_PINYIN_MAP["characters"]
-_WORDS = _HANZI_PINYIN_MAP["words"]
+
+# User dictionaries are layered in front of the built-in data, so that the
+# built-in dictionaries never need to be copied or modified.
+_CHARACTERS = ChainMap(_HANZI_PINYIN_MAP["characters"])
+_WORDS = ChainMap(_HANZI_PINYIN_MAP["words"])
+_USER_DICTIONARIES = {}
+
+# The length of the longest key of each word dictionary that isn't packed:
+# {id(DICTIONARY): LENGTH}. It's cleared whenever the dictionaries change.
+_WORD_LENGTHS = {}
+
+
+# Gaps between code points that are smaller than this are included in the
+# character ranges, which keeps the number of ranges small.
+_MAX_RANGE_GAP = 1024
+
+
+def _load_character_pattern():
+    """Build a regular expression that matches runs of Chinese characters.
+
+    The code points of all characters with readings are collapsed into a
+    sorted table of ranges, which is compiled into a character class.
+
+    """
+    code_points = sorted(map(ord, _CHARACTERS))
+    ranges = []
+    range_start = range_end = code_points[0]
+    for code_point in code_points[1:]:
+        if code_point - range_end > _MAX_RANGE_GAP:
+            ranges.append((range_start, range_end))
+            range_start = code_point
+        range_end = code_point
+    ranges.append((range_start, range_end))
+    character_class = "".join(
+        "{}-{}".format(re.escape(chr(range_start)), re.escape(chr(range_end)))
+        for range_start, range_end in ranges
+    )
+    return re.compile("[{}]+".format(character_class))
+
+
+_CHARACTER_PATTERN = _load_character_pattern()
+
+
+def _replace_layer(chain, old_layer, new_layer):
+    """Replace *old_layer* in a ChainMap with *new_layer*.
+
+    If *new_layer* is ``None``, *old_layer* is removed.
+
+    """
+    for i, layer in enumerate(chain.maps):
+        if layer is old_layer:
+            if new_layer is None:
+                del chain.maps[i]
+            else:
+                chain.maps[i] = new_layer
+            return
+
+
+def load_dictionary(filename, name=None, encoding="utf-8"):
+    """Load a user dictionary that takes priority over the built-in data.
+
+    *filename* is the path to a tab-separated file in the same format as the
+    built-in data files: each line contains a word, a tab, and the word's
+    accented Pinyin readings separated by ``'/'``. Single-character entries
+    are used as character readings and longer entries as word readings.
+
+    *name* identifies the dictionary and defaults to *filename*. Loading a
+    dictionary with a name that is already loaded replaces its entries and
+    keeps its priority. Otherwise, dictionaries that are loaded later take
+    priority over dictionaries that were loaded earlier.
+
+    """
+    if name is None:
+        name = filename
+    with open(filename, encoding=encoding) as f:
+        data = _parse_data(f.read().splitlines())
+    words, characters = {}, {}
+    for hanzi, readings in data.items():
+        if len(hanzi) == 1:
+            characters[hanzi] = readings
+        else:
+            words[hanzi] = readings
+
+    _add_user_dictionary(name, words, characters)
+
+
+def _add_user_dictionary(name, words, characters):
+    """Layer a user dictionary's words and characters over the loaded ones."""
+    if name in _USER_DICTIONARIES:
+        old_words, old_characters = _USER_DICTIONARIES[name]
+        _replace_layer(_WORDS, old_words, words)
+        _replace_layer(_CHARACTERS, old_characters, characters)
+    else:
+        _WORDS.maps.insert(0, words)
+        _CHARACTERS.maps.insert(0, characters)
+    _USER_DICTIONARIES[name] = (words, characters)
+    _WORD_LENGTHS.clear()
+    _update_character_pattern()
+    _reset_data_fingerprint()
+
+
+def unload_dictionary(name):
+    """Unload a user dictionary that was loaded with :func:`load_dictionary`.
+
+    *name* is the name the dictionary was loaded with.
+
+    """
+    try:
+        words, characters = _USER_DICTIONARIES.pop(name)
+    except KeyError:
+        raise ValueError("No user dictionary loaded: {}".format(name))
+    _replace_layer(_WORDS, words, None)
+    _replace_layer(_CHARACTERS, characters, None)
+    _WORD_LENGTHS.clear()
+    _update_character_pattern()
+    _reset_data_fingerprint()
+
+
+# The data files that conversions depend on.
+_DATA_FILES = (
+    "hanzi_pinyin_words.tsv",
+    "hanzi_pinyin_characters.tsv",
+    "transcriptions.csv",
+)
+_DATA_FINGERPRINT = None
+
+
+def data_fingerprint():
+    """Return a string that changes whenever the conversion data changes.
+
+    The fingerprint is a SHA-256 hex digest of the package version, the
+    contents of the built-in data files, and the entries of the loaded user
+    dictionaries in order of priority. It can be stored with converted text to
+    tell whether the text needs to be converted again.
+
+    """
+    global _DATA_FINGERPRINT
+    if _DATA_FINGERPRINT is None:
+        digest = hashlib.sha256(dragonmapper.__version__.encode("utf-8"))
+        for file_name in _DATA_FILES:
+            digest.update(dragonmapper.data.load_data_bytes(file_name))
+        for layers in (_WORDS.maps[:-1], _CHARACTERS.maps[:-1]):
+            for layer in layers:
+                entries = json.dumps(sorted(layer.items()), ensure_ascii=False)
+                digest.update(b"\0" + entries.encode("utf-8"))
+        _DATA_FINGERPRINT = digest.hexdigest()
+    return _DATA_FINGERPRINT
+
+
+def _reset_data_fingerprint():
+    """Recompute the fingerprint the next time it's needed."""
+    global _DATA_FINGERPRINT
+    _DATA_FINGERPRINT = None
+
+
+def _update_character_pattern():
+    """Rebuild the character pattern after the loaded characters changed."""
+    global _CHARACTER_PATTERN
+    _CHARACTER_PATTERN = _load_character_pattern()
 
 
-def _hanzi_to_pinyin(hanzi):
-    """Return the Pinyin reading for a Chinese word.
+def _replace_dictionaries(data):
+    """Replace the built-in word and character dictionaries with *data*."""
+    _replace_layer(_WORDS, _HANZI_PINYIN_MAP["words"], data["words"])
+    _replace_layer(_CHARACTERS, _HANZI_PINYIN_MAP["characters"], data["characters"])
+    _HANZI_PINYIN_MAP.update(data)
+    _WORD_LENGTHS.clear()
 
-    If the given string *hanzi* matches a CC-CEDICT word, the return value is
-    formatted like this: [WORD_READING1, WORD_READING2, ...]
 
-    If the given string *hanzi* doesn't match a CC-CEDICT word, the return
-    value is formatted like this: [[CHAR_READING1, CHAR_READING2 ...], ...]
+def compact_dictionaries():
+    """Store the built-in dictionaries in a compact, read-only form.
 
-    When returning character readings, if a character wasn't recognized, the
-    original character is returned, e.g. [[CHAR_READING1, ...], CHAR, ...]
+    The built-in dictionaries normally use about 100 MB of memory. After
+    calling this function, they're stored in about 6 MB instead. Like
+    :func:`share_dictionaries`, this makes conversion slower, because a
+    reading is decoded every time it's looked up. User dictionaries aren't
+    affected.
 
     """
+    if isinstance(_HANZI_PINYIN_MAP["words"], _PackedDictionary):
+        return
+    _replace_dictionaries(
+        {
+            name: _PackedDictionary(_PackedDictionary.pack(data))
+            for name, data in _HANZI_PINYIN_MAP.items()
+        }
+    )
+
+
+def share_dictionaries():
+    """Move the built-in dictionaries into shared memory.
+
+    This lets a pool of worker processes use one copy of the built-in
+    dictionaries instead of one copy per process. Call it in the parent
+    process before starting the workers. The name of the shared memory block
+    is returned and stored in the ``DRAGONMAPPER_SHARED_DICTIONARIES``
+    environment variable:
+
+    * Workers that are forked after this function is called use the shared
+      dictionaries automatically.
+    * Workers that are started as new processes and inherit the environment
+      attach to the shared dictionaries when they import this module, instead
+      of loading the data files.
+    * Other processes can attach with :func:`attach_dictionaries`.
+
+    The shared dictionaries are read-only and can't contain Python objects,
+    so a reading is decoded every time it's looked up. This makes conversion
+    slower. User dictionaries aren't shared.
+
+    The shared memory block is removed when the process that called this
+    function exits, so it should outlive its workers.
+
+    """
+    global _SHARED_MEMORY
+    if _SHARED_MEMORY is not None:
+        return _SHARED_MEMORY.name
+    words = _PackedDictionary.pack(_HANZI_PINYIN_MAP["words"])
+    characters = _PackedDictionary.pack(_HANZI_PINYIN_MAP["characters"])
+    size = 4 + len(words) + len(characters)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    block.buf[:size] = b"".join((array("I", [len(words)]), words, characters))
+    _SHARED_MEMORY = block
+    atexit.register(_close_shared_memory, block, os.getpid())
+    _replace_dictionaries(_unpack_dictionaries(block.buf[:size]))
+    os.environ[_SHARED_DICTIONARIES_VARIABLE] = block.name
+    return block.name
+
+
+def attach_dictionaries(name):
+    """Use built-in dictionaries that were shared by another process.
+
+    *name* is the name returned by :func:`share_dictionaries`. The
+    dictionaries this process loaded are released. Workers usually don't need
+    to call this; see :func:`share_dictionaries`.
+
+    """
+    global _SHARED_MEMORY
+    if _SHARED_MEMORY is not None and _SHARED_MEMORY.name == name:
+        return
+    block = _attach_shared_memory(name)
+    _SHARED_MEMORY = block
+    _replace_dictionaries(_unpack_dictionaries(block.buf))
+
+
+def _longest_key(layer, s, start):
+    """Return the longest key of a word dictionary at index *start* of *s*."""
+    if isinstance(layer, _PackedDictionary):
+        return layer.longest_prefix(s, start)[0]
+    length = _WORD_LENGTHS.get(id(layer))
+    if length is None:
+        length = _WORD_LENGTHS[id(layer)] = max(map(len, layer), default=0)
+    for end in range(min(len(s), start + length), start, -1):
+        if s[start:end] in layer:
+            return s[start:end]
+    return None
+
+
+def longest_word(s, start=0):
+    """Find the longest word with readings that occurs in *s* at *start*.
+
+    User dictionaries are searched along with the built-in dictionaries. If
+    no word occurs at *start*, the character there is used. A tuple
+    formatted like this is returned: (WORD, READINGS). If the character
+    doesn't have readings either, ``(None, None)`` is returned.
+
+    """
+    if not 0 <= start < len(s):
+        return None, None
+    found = None
+    for layer in _WORDS.maps:
+        key = _longest_key(layer, s, start)
+        if key is not None and (found is None or len(key) > len(found)):
+            found = key
+    if found is not None:
+        return found, _WORDS[found]
+    readings = _CHARACTERS.get(s[start])
+    if readings is None:
+        return None, None
+    return s[start], readings
+
+
+def iter_words(prefix=""):
+    """Yield the words with readings that start with *prefix*.
+
+    User dictionaries are searched along with the built-in dictionaries.
+    Tuples formatted like this are yielded in sorted order: (WORD, READINGS).
+    After :func:`compact_dictionaries` is called, the built-in words are
+    found without going through all of them.
+
+    """
+    streams = []
+    for layer in _WORDS.maps:
+        if isinstance(layer, _PackedDictionary):
+            streams.append(word for word, _ in layer.iter_prefix(prefix))
+        else:
+            streams.append(sorted(word for word in layer if word.startswith(prefix)))
+    previous = None
+    for word in heapq.merge(*streams):
+        if word != previous:
+            yield word, _WORDS[word]
+            previous = word
+
+
+# The functions used to convert accented Pinyin readings to other
+# transcription systems. Like to_zhuyin() and to_ipa(), they go through
+# numbered Pinyin, which handles capitalized readings.
+_TRANSCRIPTION_FUNCTIONS = {
+    "numbered": accented_to_numbered,
+    "zhuyin": lambda reading: pinyin_to_zhuyin(accented_to_numbered(reading)),
+    "ipa": lambda reading: pinyin_to_ipa(accented_to_numbered(reading)),
+}
+
+# Stored readings: {SYSTEM: {PINYIN_READING: CONVERTED_READING}}.
+_TRANSCRIPTIONS = {}
+
+
+def load_transcriptions(systems=("numbered", "zhuyin", "ipa"), precompile=False):
+    """Store the dictionaries' readings in other transcription systems.
+
+    Normally, :func:`to_zhuyin`, :func:`to_ipa`, and :func:`to_pinyin` with
+    *accented* set to ``False`` convert their accented Pinyin output every
+    time they're called. After calling this function, each reading is
+    converted once and the stored result is used from then on.
+
+    *systems* is an iterable containing the transcription systems to store:
+    ``'numbered'`` (numbered Pinyin), ``'zhuyin'``, and ``'ipa'``.
+
+    If *precompile* is ``False``, readings are converted the first time
+    they're used, so memory is only used for readings that appear in the
+    converted text. If it's ``True``, every reading in the loaded dictionaries
+    is converted immediately. This takes several seconds and uses 10–15 MB of
+    memory per transcription system.
+
+    Only readings are converted, so text that isn't recognized as Chinese is
+    left untouched. Without stored readings, anything in that text that looks
+    like Pinyin, e.g. parts of English words, is converted too.
+
+    """
+    for system in systems:
+        if system not in _TRANSCRIPTION_FUNCTIONS:
+            raise ValueError("Unknown transcription system: {}".format(system))
+        table = _TRANSCRIPTIONS.setdefault(system, {})
+        if not precompile:
+            continue
+        convert = _TRANSCRIPTION_FUNCTIONS[system]
+        for layer in _WORDS.maps + _CHARACTERS.maps:
+            for readings in layer.values():
+                for reading in readings:
+                    if reading in table:
+                        continue
+                    try:
+                        table[reading] = convert(reading)
+                    except ValueError:
+                        # Leave the error for when the reading is used.
+                        pass
+
+
+def unload_transcriptions():
+    """Remove the readings stored by :func:`load_transcriptions`."""
+    _TRANSCRIPTIONS.clear()
+
+
+def _transcribe(reading, system):
+    """Return the *system* transcription of a Pinyin reading.
+
+    If transcriptions for *system* have been loaded, the stored transcription
+    is used.
+
+    """
+    table = _TRANSCRIPTIONS.get(system)
+    if table is None:
+        return _TRANSCRIPTION_FUNCTIONS[system](reading)
     try:
-        return _HANZI_PINYIN_MAP["words"][hanzi]
+        return table[reading]
     except KeyError:
-        return [_CHARACTERS.get(character, character) for character in hanzi]
+        transcription = table[reading] = _TRANSCRIPTION_FUNCTIONS[system](reading)
+        return transcription
+
+
+def _load_collocations():
+    """Build a table of character readings from multi-character words.
+
+    Each word's reading is split into syllables and aligned with the word's
+    characters. For every pair of adjacent characters, the table stores the
+    reading each character most often has when used next to the other one:
+        {PAIR: (FIRST_READING, FIRST_COUNT, SECOND_READING, SECOND_COUNT)}
+
+    A reading is ``None`` if that character only has one reading. Pairs
+    without any polyphonic characters aren't stored.
+
+    """
+    characters = _HANZI_PINYIN_MAP["characters"]
+    votes = {}
+    for word, readings in _HANZI_PINYIN_MAP["words"].items():
+        if len(word) < 2:
+            continue
+        syllables = _align_reading(word, readings[0], characters)
+        if syllables is None:
+            continue
+        for i in range(len(word) - 1):
+            first, second = word[i], word[i + 1]
+            if len(characters[first]) == 1 and len(characters[second]) == 1:
+                continue
+            pair_votes = votes.setdefault(first + second, ({}, {}))
+            for side, syllable in zip(pair_votes, syllables[i : i + 2]):
+                side[syllable] = side.get(syllable, 0) + 1
+
+    collocations = {}
+    for pair, (first_votes, second_votes) in votes.items():
+        entry = ()
+        for character, side in zip(pair, (first_votes, second_votes)):
+            if len(characters[character]) == 1:
+                entry += (None, 0)
+            else:
+                reading = max(side, key=side.get)
+                entry += (reading, side[reading])
+        collocations[pair] = entry
+    return collocations
+
+
+def _align_reading(word, reading, characters):
+    """Split a word's reading into one syllable per character.
+
+    Only syllables that are one of the character's own readings are
+    accepted. ``None`` is returned if the reading can't be aligned.
+
+    """
+    reading = reading.lower().replace("'", "")
+    syllables = []
+    position = 0
+    for character in word:
+        candidates = characters.get(character)
+        if candidates is None:
+            return None
+        matched = ""
+        for candidate in candidates:
+            if len(candidate) > len(matched) and reading.startswith(
+                candidate, position
+            ):
+                matched = candidate
+        if not matched:
+            return None
+        syllables.append(matched)
+        position += len(matched)
+    return syllables if position == len(reading) else None
+
+
+_COLLOCATIONS = None
+
+
+def _disambiguate(hanzi, i, readings):
+    """Choose the reading of the polyphonic character ``hanzi[i]``.
+
+    *readings* are the character's current readings. The collocation table
+    is checked for the character's neighbors and the reading backed by the
+    most words is returned. The table is built from the built-in data, so
+    its readings are only used if they're in *readings*. Otherwise, the
+    first reading is returned.
+
+    """
+    global _COLLOCATIONS
+    if _COLLOCATIONS is None:
+        _COLLOCATIONS = _load_collocations()
+    reading, count = readings[0], 0
+    if i > 0:
+        entry = _COLLOCATIONS.get(hanzi[i - 1 : i + 1])
+        if entry is not None and entry[2] in readings:
+            reading, count = entry[2], entry[3]
+    entry = _COLLOCATIONS.get(hanzi[i : i + 2])
+    if entry is not None and entry[0] in readings and entry[1] > count:
+        reading = entry[0]
+    return reading
+
+
+# The kinds of tokens yielded by _tokenize().
+_TEXT = 0  # Delimiters and punctuation.
+_WORD = 1
+_CHARACTER = 2
+_UNKNOWN = 3  # Characters without readings.
+
+
+def _tokenize(s, delimiter=" ", disambiguate=False):
+    """Split *s* into words, characters, and other text.
+
+    Each token is a tuple formatted like this:
+        (KIND, START, END, READINGS, READING)
+
+    *START* and *END* are the token's position in *s*. *READINGS* is the list
+    of the token's readings and *READING* is the one that should be used by
+    default. Both are ``None`` for text that doesn't have readings.
+
+    """
+    pattern = "[^{}{}]+".format(re.escape(delimiter), zhon.hanzi.punctuation)
+    character_pattern = _CHARACTER_PATTERN
+    # Without user dictionaries, skip the ChainMaps' lookup overhead.
+    get_word = _WORDS.get if _USER_DICTIONARIES else _WORDS.maps[0].get
+    get_character = _CHARACTERS.get if _USER_DICTIONARIES else _CHARACTERS.maps[0].get
+    position = 0
+    for match in re.finditer(pattern, s):
+        start, end = match.span()
+        # Process the punctuation marks that occur before the match.
+        if start > position:
+            yield _TEXT, position, start, None, None
+        position = end
+
+        hanzi = match.group()
+        readings = get_word(hanzi)
+        if readings is not None:
+            yield _WORD, start, end, readings, readings[0]
+            continue
+
+        # Process each character individually. Text outside of the ranges of
+        # characters with readings is passed through all at once.
+        unknown_start = start
+        for run in character_pattern.finditer(s, start, end):
+            run_start, run_end = run.span()
+            if run_start > unknown_start:
+                yield _UNKNOWN, unknown_start, run_start, None, None
+            unknown_start = run_end
+            for i in range(run_start, run_end):
+                readings = get_character(s[i])
+                if readings is None:
+                    yield _UNKNOWN, i, i + 1, None, None
+                    continue
+                reading = readings[0]
+                if disambiguate and len(readings) > 1:
+                    reading = _disambiguate(hanzi, i - start, readings)
+                yield _CHARACTER, i, i + 1, readings, reading
+        if unknown_start < end:
+            yield _UNKNOWN, unknown_start, end, None, None
+
+    if position < len(s):
+        yield _TEXT, position, len(s), None, None
+
+
+def analyze(texts, delimiter=" "):
+    """Count how the characters in *texts* would be read.
+
+    *texts* is an iterable of strings. It's processed one string at a time,
+    so it can be a generator over a large corpus. *delimiter* is used like
+    it is in :func:`to_pinyin`.
+
+    A :class:`collections.Counter` is returned with these keys:
+
+    * ``'texts'``: the number of strings processed.
+    * ``'words'``: the number of recognized words.
+    * ``'word_characters'``: the number of characters read as part of a word.
+    * ``'characters'``: the number of characters that fell back to
+      per-character readings.
+    * ``'polyphonic'``: the number of those characters that have more than one
+      reading.
+    * ``'unknown'``: the number of characters that have no reading and are
+      passed through untouched. This includes non-Chinese text.
+
+    Counters can be added together, so a corpus can be split into parts that
+    are analyzed separately, e.g. in a :class:`multiprocessing.Pool`, and the
+    results summed afterwards.
+
+    """
+    counts = Counter()
+    words = word_characters = characters = polyphonic = unknown = 0
+    for s in texts:
+        counts["texts"] += 1
+        for kind, start, end, readings, reading in _tokenize(s, delimiter):
+            if kind == _WORD:
+                words += 1
+                word_characters += end - start
+            elif kind == _CHARACTER:
+                characters += 1
+                if len(readings) > 1:
+                    polyphonic += 1
+            elif kind == _UNKNOWN:
+                unknown += end - start
+    counts.update(
+        words=words,
+        word_characters=word_characters,
+        characters=characters,
+        polyphonic=polyphonic,
+        unknown=unknown,
+    )
+    return counts
+
+
+# Punctuation marks and line breaks end a phrase, so tone sandhi isn't
+# applied across them.
+_SANDHI_BREAK_PATTERN = re.compile("[{}\r\n]".format(zhon.hanzi.punctuation))
+_SANDHI_SYLLABLE_PATTERN = re.compile(
+    "({})".format(zhon.pinyin.accented_syllable), re.IGNORECASE
+)
+# 一 keeps its first tone before these numerals, e.g. in 一二三 or 一十.
+_SANDHI_NUMERALS = "〇一二三四五六七八九十"
+
+
+def _apply_sandhi(s, tokens):
+    """Apply tone sandhi to the default readings of *tokens*.
+
+    Consecutive tokens that aren't separated by punctuation or unrecognized
+    text are collected into a phrase, and the rules are applied to each
+    phrase by :func:`_apply_phrase_sandhi`. The tokens are yielded with their
+    *READING* changed.
+
+    """
+    phrase = []
+    for token in tokens:
+        kind, start, end, readings, reading = token
+        if reading is not None or (
+            kind == _TEXT and not _SANDHI_BREAK_PATTERN.search(s, start, end)
+        ):
+            phrase.append(token)
+            continue
+        yield from _apply_phrase_sandhi(s, phrase)
+        phrase = []
+        yield token
+    yield from _apply_phrase_sandhi(s, phrase)
+
+
+def _apply_phrase_sandhi(s, phrase):
+    """Apply tone sandhi to a phrase's tokens and return them.
+
+    The rules are applied to numbered tones:
+
+    1. 一 (yi1) becomes yi2 before a fourth tone and yi4 before a first,
+       second, or third tone. It keeps its tone at the end of a word, after
+       第, and before numerals.
+    2. 不 (bu4) becomes bu2 before a fourth tone, unless it ends a word.
+    3. A third tone becomes a second tone before another third tone. Inside
+       a word, this is applied to all but the last of a run of third tones.
+       Between words, it's applied from right to left using the tone that the
+       next syllable ends up with, so 纸 老虎 keeps its first third tone.
+
+    """
+    # [[TOKEN_INDEX, PARTS, TONES, CHARACTERS]...]. See _split_reading().
+    words = []
+    for index, (kind, start, end, readings, reading) in enumerate(phrase):
+        if reading is None:
+            continue
+        try:
+            parts, tones = _split_reading(reading)
+        except ValueError:
+            continue
+        characters = s[start:end] if end - start == len(tones) else None
+        words.append([index, parts, tones, characters])
+
+    syllables = [
+        (word, i) for word in words for i in range(len(word[2]))
+    ]  # Every syllable in the phrase: [(WORD, SYLLABLE_INDEX)...].
+    surface = {}  # {(TOKEN_INDEX, SYLLABLE_INDEX): NEW_TONE}.
+
+    # The tones of 一 and 不.
+    for position, (word, i) in enumerate(syllables[:-1]):
+        index, parts, tones, characters = word
+        character = characters[i] if characters else None
+        if character not in ("一", "不") or (i + 1 == len(tones) > 1):
+            continue
+        next_word, next_i = syllables[position + 1]
+        next_tone = next_word[2][next_i]
+        syllable = parts[2 * i + 1].lower()
+        if character == "一" and syllable == "yī":
+            next_characters = next_word[3]
+            if next_characters and next_characters[next_i] in _SANDHI_NUMERALS:
+                continue
+            if position and syllables[position - 1][0][3]:
+                previous_word, previous_i = syllables[position - 1]
+                if previous_word[3][previous_i] == "第":
+                    continue
+            if next_tone == "4":
+                surface[index, i] = "2"
+            elif next_tone in "123":
+                surface[index, i] = "4"
+        elif character == "不" and syllable == "bù":
+            if next_tone == "4":
+                surface[index, i] = "2"
+
+    # Third tone sandhi.
+    following = None
+    for word in reversed(words):
+        index, parts, tones, characters = word
+        for i in reversed(range(len(tones))):
+            tone = surface.get((index, i), tones[i])
+            if tone == "3":
+                if i + 1 < len(tones):
+                    if tones[i + 1] == "3":
+                        tone = surface[index, i] = "2"
+                elif following == "3":
+                    tone = surface[index, i] = "2"
+            following = tone
+
+    if not surface:
+        return phrase
+    phrase = list(phrase)
+    for index, parts, tones, characters in words:
+        new_parts = None
+        for i, tone in enumerate(tones):
+            new_tone = surface.get((index, i), tone)
+            if new_tone == tone:
+                continue
+            if new_parts is None:
+                new_parts = list(parts)
+            numbered = accented_syllable_to_numbered(parts[2 * i + 1])
+            new_parts[2 * i + 1] = numbered_syllable_to_accented(
+                numbered[:-1] + new_tone
+            )
+        if new_parts is not None:
+            kind, start, end, readings, reading = phrase[index]
+            phrase[index] = (kind, start, end, readings, "".join(new_parts))
+    return phrase
+
+
+@functools.lru_cache(maxsize=None)
+def _split_reading(reading):
+    """Split an accented Pinyin reading into syllables and find their tones.
+
+    A tuple is returned formatted like this: (PARTS, TONES). PARTS contains
+    the text between syllables and the syllables, e.g.
+    ``('', 'xǐ', '', 'huan', '')``. TONES contains each syllable's tone
+    number as a string, e.g. ``('3', '5')``.
+
+    """
+    parts = tuple(_SANDHI_SYLLABLE_PATTERN.split(reading))
+    tones = tuple(
+        accented_syllable_to_numbered(syllable)[-1] for syllable in parts[1::2]
+    )
+    return parts, tones
 
 
 def _enclose_readings(container, readings):
@@ -84,7 +1071,145 @@ def _enclose_readings(container, readings):
     return enclosed_readings
 
 
-def to_pinyin(s, delimiter=" ", all_readings=False, container="[]", accented=True):
+def _render(s, tokens, all_readings, container, system=None, offsets=None):
+    """Yield the readings of *tokens* as fragments of the converted string.
+
+    If *system* is ``None``, accented Pinyin readings are used. Otherwise, the
+    readings are converted to *system* using the stored transcriptions.
+
+    If *offsets* is an array, the output offset of each character in *s* is
+    appended to it.
+
+    """
+    separate_syllables = system in ("zhuyin", "ipa")
+    previous = ""  # The last character of the accented Pinyin output.
+    after_reading = False
+    length = 0  # The length of the output so far, if offsets are needed.
+    for kind, start, end, readings, reading in tokens:
+        # Don't touch unrecognized characters.
+        if readings is None:
+            fragment = s[start:end]
+            previous = fragment[-1]
+            after_reading = False
+            if offsets is not None:
+                offsets.extend(range(length, length + end - start))
+                length += end - start
+            yield fragment
+            continue
+        # Format multiple readings.
+        elif all_readings:
+            if system is not None:
+                readings = [_transcribe(r, system) for r in readings]
+            fragment = _enclose_readings(container, _READING_SEPARATOR.join(readings))
+            previous = container[-1]
+            after_reading = False
+        # Select and format the most common reading.
+        else:
+            # Zhuyin and IPA syllables are separated by spaces.
+            if separate_syllables:
+                if after_reading:
+                    yield " "
+                    length += 1
+            # Add an apostrophe to separate syllables.
+            elif (
+                kind == _CHARACTER
+                and previous
+                and previous in zhon.pinyin.lowercase
+                and reading[0] in zhon.pinyin.vowels
+            ):
+                yield "'"
+                length += 1
+            fragment = reading if system is None else _transcribe(reading, system)
+            previous = reading[-1]
+            after_reading = True
+        if offsets is not None:
+            if kind == _CHARACTER:
+                offsets.append(length)
+            else:
+                offsets.extend(repeat(length, end - start))
+            length += len(fragment)
+        yield fragment
+    if offsets is not None:
+        offsets.append(length)
+
+
+def _compose_offsets(first, second):
+    """Combine the offsets of two conversions done one after the other."""
+    return array("I", [second[offset] for offset in first])
+
+
+def _check_system(system):
+    """Raise :exc:`ValueError` if *system* isn't a transcription system."""
+    if system != "pinyin" and system not in _TRANSCRIPTION_FUNCTIONS:
+        raise ValueError("Unknown transcription system: {}".format(system))
+
+
+def _convert(s, tokens, system, all_readings, container, writer=None, offsets=False):
+    """Convert *tokens* to *system*.
+
+    *system* is ``'pinyin'`` (accented Pinyin), ``'numbered'`` (numbered
+    Pinyin), ``'zhuyin'``, or ``'ipa'``.
+
+    If *writer* is given, the converted string is written to it and ``None``
+    is returned in its place. Readings that don't need to be converted with a
+    regular expression afterwards are written as soon as they're produced.
+
+    If *offsets* is ``True``, a tuple is returned formatted like this:
+    (CONVERTED_STRING, OFFSETS).
+
+    """
+    offset_table = array("I") if offsets else None
+    if system == "pinyin" or system in _TRANSCRIPTIONS:
+        fragments = _render(
+            s,
+            tokens,
+            all_readings,
+            container,
+            None if system == "pinyin" else system,
+            offset_table,
+        )
+        if writer is None:
+            converted = "".join(fragments)
+        else:
+            write = writer.write
+            for fragment in fragments:
+                write(fragment)
+            converted = None
+        return (converted, offset_table) if offsets else converted
+    elif system not in _TRANSCRIPTION_FUNCTIONS:
+        raise ValueError("Unknown transcription system: {}".format(system))
+
+    # Convert the accented Pinyin output with regular expressions.
+    pinyin = "".join(_render(s, tokens, all_readings, container, None, offset_table))
+    if system == "numbered":
+        conversions = [(accented_to_numbered, writer)]
+    elif system == "zhuyin":
+        conversions = [(accented_to_numbered, None), (pinyin_to_zhuyin, writer)]
+    else:
+        conversions = [(accented_to_numbered, None), (pinyin_to_ipa, writer)]
+    converted = pinyin
+    for function, function_writer in conversions:
+        if offsets:
+            converted, function_offsets = function(
+                converted, writer=function_writer, offsets=True
+            )
+            offset_table = _compose_offsets(offset_table, function_offsets)
+        else:
+            converted = function(converted, writer=function_writer)
+    return (converted, offset_table) if offsets else converted
+
+
+def to_pinyin(
+    s,
+    delimiter=" ",
+    all_readings=False,
+    container="[]",
+    accented=True,
+    disambiguate=False,
+    writer=None,
+    offsets=False,
+    sandhi=False,
+):
     """Convert a string's Chinese characters to Pinyin readings.
 
     *s* is a string containing Chinese characters. *accented* is a
@@ -101,74 +1226,48 @@ def to_pinyin(s, delimiter=" ", all_readings=False, container="[]", accented=Tru
     enclose words/characters if *all_readings* is ``True``. The default
     ``'[]'`` is used like this: ``'[READING1/READING2]'``.
 
-    Characters not recognized as Chinese are left untouched.
-
-    """
-    hanzi = s
-    pinyin = ""
-
-    # Process the given string.
-    while hanzi:
-        # Get the next match in the given string.
-        match = re.search("[^{}{}]+".format(delimiter, zhon.hanzi.punctuation), hanzi)
+    *disambiguate* is a boolean value indicating whether or not to choose
+    the readings of characters that aren't part of a recognized word by
+    looking at their neighboring characters. The readings are chosen using a
+    table of character pairs found in CC-CEDICT's words, which is built the
+    first time it's needed. If it's ``False``, the most common reading is
+    used.
 
-        # There are no more matches, but the string isn't finished yet.
-        if match is None and hanzi:
-            pinyin += hanzi
-            break
+    If *writer* is given, the readings are written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
+    Accented Pinyin, and readings stored by :func:`load_transcriptions`, are
+    written one fragment at a time as *s* is converted.
 
-        match_start, match_end = match.span()
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
 
-        # Process the punctuation marks that occur before the match.
-        if match_start > 0:
-            pinyin += hanzi[0:match_start]
+    *sandhi* is a boolean value indicating whether or not to apply tone
+    sandhi to the readings: third tone sandhi and the tone changes of 一 and
+    不. Word boundaries, punctuation, and line breaks are taken into account.
+    Dictionary readings aren't affected, so it has no effect when
+    *all_readings* is ``True``.
 
-        # Get the Chinese word/character readings.
-        readings = _hanzi_to_pinyin(match.group())
-
-        # Process the returned word readings.
-        if match.group() in _WORDS:
-            if all_readings:
-                reading = _enclose_readings(
-                    container, _READING_SEPARATOR.join(readings)
-                )
-            else:
-                reading = readings[0]
-            pinyin += reading
+    Characters not recognized as Chinese are left untouched.
 
-        # Process the returned character readings.
-        else:
-            # Process each character individually.
-            for character in readings:
-                # Don't touch unrecognized characters.
-                if isinstance(character, str):
-                    pinyin += character
-                # Format multiple readings.
-                elif isinstance(character, list) and all_readings:
-                    pinyin += _enclose_readings(
-                        container, _READING_SEPARATOR.join(character)
-                    )
-                # Select and format the most common reading.
-                elif isinstance(character, list) and not all_readings:
-                    # Add an apostrophe to separate syllables.
-                    if (
-                        pinyin
-                        and character[0][0] in zhon.pinyin.vowels
-                        and pinyin[-1] in zhon.pinyin.lowercase
-                    ):
-                        pinyin += "'"
-                    pinyin += character[0]
-
-        # Move ahead in the given string.
-        hanzi = hanzi[match_end:]
-
-    if accented:
-        return pinyin
-    else:
-        return accented_to_numbered(pinyin)
+    """
+    tokens = _tokenize(s, delimiter, disambiguate)
+    if sandhi:
+        tokens = _apply_sandhi(s, tokens)
+    system = "pinyin" if accented else "numbered"
+    return _convert(s, tokens, system, all_readings, container, writer, offsets)
 
 
-def to_zhuyin(s, delimiter=" ", all_readings=False, container="[]"):
+def to_zhuyin(
+    s,
+    delimiter=" ",
+    all_readings=False,
+    container="[]",
+    disambiguate=False,
+    writer=None,
+    offsets=False,
+    sandhi=False,
+):
     """Convert a string's Chinese characters to Zhuyin readings.
 
     *s* is a string containing Chinese characters.
@@ -183,15 +1282,34 @@ def to_zhuyin(s, delimiter=" ", all_readings=False, container="[]"):
     enclose words/characters if *all_readings* is ``True``. The default
     ``'[]'`` is used like this: ``'[READING1/READING2]'``.
 
+    *disambiguate* is a boolean value indicating whether or not to choose
+    character readings by looking at neighboring characters. See
+    :func:`to_pinyin` for more information.
+
+    If *writer* is given, the readings are written to it instead of being
+    returned. If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned.
+    If *sandhi* is ``True``, tone sandhi is applied. See :func:`to_pinyin` for
+    more information.
+
     Characters not recognized as Chinese are left untouched.
 
     """
-    numbered_pinyin = to_pinyin(s, delimiter, all_readings, container, False)
-    zhuyin = pinyin_to_zhuyin(numbered_pinyin)
-    return zhuyin
+    tokens = _tokenize(s, delimiter, disambiguate)
+    if sandhi:
+        tokens = _apply_sandhi(s, tokens)
+    return _convert(s, tokens, "zhuyin", all_readings, container, writer, offsets)
 
 
-def to_ipa(s, delimiter=" ", all_readings=False, container="[]"):
+def to_ipa(
+    s,
+    delimiter=" ",
+    all_readings=False,
+    container="[]",
+    disambiguate=False,
+    writer=None,
+    offsets=False,
+    sandhi=False,
+):
     """Convert a string's Chinese characters to IPA.
 
     *s* is a string containing Chinese characters.
@@ -206,9 +1324,292 @@ def to_ipa(s, delimiter=" ", all_readings=False, container="[]"):
     enclose words/characters if *all_readings* is ``True``. The default
     ``'[]'`` is used like this: ``'[READING1/READING2]'``.
 
+    *disambiguate* is a boolean value indicating whether or not to choose
+    character readings by looking at neighboring characters. See
+    :func:`to_pinyin` for more information.
+
+    If *writer* is given, the readings are written to it instead of being
+    returned. If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned.
+    If *sandhi* is ``True``, tone sandhi is applied. See :func:`to_pinyin` for
+    more information.
+
     Characters not recognized as Chinese are left untouched.
 
     """
-    numbered_pinyin = to_pinyin(s, delimiter, all_readings, container, False)
-    ipa = pinyin_to_ipa(numbered_pinyin)
-    return ipa
+    tokens = _tokenize(s, delimiter, disambiguate)
+    if sandhi:
+        tokens = _apply_sandhi(s, tokens)
+    return _convert(s, tokens, "ipa", all_readings, container, writer, offsets)
+
+
+def _identify(s):
+    """Identify the Chinese characters in *s* like :func:`identify` does.
+
+    Instead of extracting the Chinese characters with a regular expression,
+    *s* is intersected with precomputed character sets.
+
+    """
+    chinese = _ALL_CHARACTERS.intersection(s)
+    if not chinese:
+        return UNKNOWN
+    if chinese <= _SHARED_CHARACTERS:
+        return BOTH
+    if chinese <= _TRADITIONAL_CHARACTERS:
+        return TRADITIONAL
+    if chinese <= _SIMPLIFIED_CHARACTERS:
+        return SIMPLIFIED
+    return MIXED
+
+
+def identify_and_convert(
+    s,
+    system="pinyin",
+    delimiter=" ",
+    all_readings=False,
+    container="[]",
+    disambiguate=False,
+):
+    """Identify and convert a string's Chinese characters.
+
+    This is faster than calling :func:`identify` and then converting *s*.
+    A tuple is returned formatted like this: (IDENTITY, CONVERTED_STRING).
+    IDENTITY is the same value that :func:`identify` returns.
+
+    *system* is the transcription system to convert to: ``'pinyin'``
+    (accented Pinyin), ``'numbered'`` (numbered Pinyin), ``'zhuyin'``, or
+    ``'ipa'``. The other arguments are the same as :func:`to_pinyin`'s.
+
+    """
+    tokens = _tokenize(s, delimiter, disambiguate)
+    return _identify(s), _convert(s, tokens, system, all_readings, container)
+
+
+# The number of bytes of input that convert_file() gives each worker.
+_REGION_SIZE = 4 * 1024 * 1024
+# convert_file() treats these like the delimiter.
+_LINE_BREAKS = "\r\n"
+
+
+def _file_split_pattern(delimiter, sandhi):
+    """Return a bytes pattern matching the characters a file can split after.
+
+    The tokenizer never puts punctuation, line breaks, or *delimiter* inside a
+    word, so the text on either side of them is converted the same way on its
+    own. Tone sandhi is only interrupted by punctuation and line breaks.
+
+    """
+    characters = set(zhon.hanzi.punctuation + _LINE_BREAKS)
+    if not sandhi:
+        characters.update(delimiter)
+    return re.compile(
+        b"|".join(re.escape(c.encode("utf-8")) for c in sorted(characters))
+    )
+
+
+def _file_regions(buffer, region_size, pattern):
+    """Yield the (START, END) byte ranges that *buffer* is split into.
+
+    Each region ends after the first split character found *region_size* or
+    more bytes after it starts. UTF-8 lead bytes never occur inside another
+    character, so a match always starts at a character boundary.
+
+    """
+    start, size = 0, len(buffer)
+    while start < size:
+        match = pattern.search(buffer, start + region_size)
+        end = size if match is None else match.end()
+        yield start, end
+        start = end
+
+
+def _convert_region(path, start, end, system, options):
+    """Convert bytes *start* to *end* of the UTF-8 file at *path*."""
+    with (
+        open(path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        s = buffer[start:end].decode("utf-8")
+    delimiter, all_readings, container, disambiguate, sandhi = options
+    tokens = _tokenize(s, delimiter + _LINE_BREAKS, disambiguate)
+    if sandhi:
+        tokens = _apply_sandhi(s, tokens)
+    return _convert(s, tokens, system, all_readings, container).encode("utf-8")
+
+
+def _conversion_state():
+    """Return the user dictionaries and stored transcription systems.
+
+    The dictionaries are listed from the lowest to the highest priority, so
+    that loading them in order restores their priorities.
+
+    """
+    priorities = [id(layer) for layer in _WORDS.maps]
+    dictionaries = sorted(
+        _USER_DICTIONARIES.items(),
+        key=lambda item: -priorities.index(id(item[1][0])),
+    )
+    return dictionaries, sorted(_TRANSCRIPTIONS)
+
+
+def _restore_conversion_state(dictionaries, systems):
+    """Load the user dictionaries and transcriptions of another process.
+
+    This is the initializer of :func:`convert_file`'s workers. Workers that
+    aren't forked start without the parent process's state.
+
+    """
+    for name, (words, characters) in dictionaries:
+        if name not in _USER_DICTIONARIES:
+            _add_user_dictionary(name, words, characters)
+    load_transcriptions(systems)
+
+
+def convert_file(
+    input_path,
+    output_path,
+    system="pinyin",
+    delimiter=" ",
+    all_readings=False,
+    container="[]",
+    disambiguate=False,
+    sandhi=False,
+    processes=None,
+    region_size=_REGION_SIZE,
+):
+    """Convert the Chinese characters of a UTF-8 file and write them to another.
+
+    Line breaks are treated as word boundaries, so each line is converted
+    as if it were on its own. Large files don't have to be read into memory:
+    the input file is memory-mapped and split into regions of about
+    *region_size* bytes that end after punctuation, a line break, or
+    *delimiter*, so a region never ends inside a word. The regions are
+    converted by *processes* worker processes, which defaults to the number of
+    CPUs, and written to *output_path* in order. If *processes* is ``1`` or
+    the file only has one region, the file is converted in this process.
+
+    *system* is ``'pinyin'`` (accented Pinyin), ``'numbered'`` (numbered
+    Pinyin), ``'zhuyin'``, or ``'ipa'``. The other arguments are the same as
+    :func:`to_pinyin`'s. The workers use the user dictionaries and stored
+    transcriptions that are loaded when this function is called, even if
+    they aren't forked from this process.
+
+    """
+    _check_system(system)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    options = (delimiter, all_readings, container, disambiguate, sandhi)
+    with open(input_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            regions = []
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                pattern = _file_split_pattern(delimiter, sandhi)
+                regions = list(_file_regions(buffer, region_size, pattern))
+
+    with open(output_path, "wb") as output:
+        if processes == 1 or len(regions) < 2:
+            for start, end in regions:
+                output.write(_convert_region(input_path, start, end, system, options))
+            return
+        # Keep a few regions queued per worker without holding every
+        # converted region in memory at once.
+        with ProcessPoolExecutor(
+            processes,
+            initializer=_restore_conversion_state,
+            initargs=_conversion_state(),
+        ) as executor:
+            pending = deque()
+            for start, end in regions:
+                if len(pending) >= 2 * processes:
+                    output.write(pending.popleft().result())
+                pending.append(
+                    executor.submit(
+                        _convert_region, input_path, start, end, system, options
+                    )
+                )
+            while pending:
+                output.write(pending.popleft().result())
+
+
+class ReadingLattice:
+    """The readings of a string's Chinese characters.
+
+    A lattice is created by :func:`to_lattice`. It stores the readings of
+    each word and character in the string, so that they can be formatted in
+    different ways without looking them up again.
+
+    """
+
+    def __init__(self, s, tokens):
+        self.text = s
+        self._tokens = tuple(tokens)
+
+    def render(
+        self,
+        system="pinyin",
+        all_readings=False,
+        container="[]",
+        writer=None,
+        offsets=False,
+    ):
+        """Format the readings as a string.
+
+        *system* is the transcription system to use: ``'pinyin'`` (accented
+        Pinyin), ``'numbered'`` (numbered Pinyin), ``'zhuyin'``, or ``'ipa'``.
+        The other arguments are the same as :func:`to_pinyin`'s.
+
+        """
+        return _convert(
+            self.text,
+            iter(self._tokens),
+            system,
+            all_readings,
+            container,
+            writer,
+            offsets,
+        )
+
+    def segments(self, system="pinyin"):
+        """Return a list of the string's segments and their readings.
+
+        Each segment is a tuple formatted like this: (TEXT, READINGS). READINGS
+        is a list of readings in *system*, with the default reading first. It's
+        ``None`` for text that doesn't have a reading.
+
+        """
+        _check_system(system)
+        segments = []
+        for kind, start, end, readings, reading in self._tokens:
+            if readings is not None:
+                readings = [reading] + [r for r in readings if r != reading]
+                if system != "pinyin":
+                    readings = [_transcribe(r, system) for r in readings]
+            segments.append((self.text[start:end], readings))
+        return segments
+
+    def to_json(self, system="pinyin"):
+        """Format the segments returned by :meth:`segments` as JSON.
+
+        Each segment is formatted as ``{"text": TEXT, "readings": READINGS}``.
+
+        """
+        return json.dumps(
+            [
+                {"text": text, "readings": readings}
+                for text, readings in self.segments(system)
+            ],
+            ensure_ascii=False,
+        )
+
+
+def to_lattice(s, delimiter=" ", disambiguate=False):
+    """Look up the readings of a string's Chinese characters.
+
+    A :class:`ReadingLattice` is returned, which can be formatted in
+    different transcription systems and formats without looking the readings
+    up again. *delimiter* and *disambiguate* are the same as
+    :func:`to_pinyin`'s arguments.
+
+    """
+    return ReadingLattice(s, _tokenize(s, delimiter, disambiguate))
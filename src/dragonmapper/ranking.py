@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Rank the readings in the dictionaries by how often they're used.
+
+The first reading of each character and word in the data files is the one
+that the conversion functions use by default, and the order of the others is
+the order that *all_readings* shows them in. This tool reorders the readings
+using frequency lists, so the most common reading comes first and nothing
+has to be reranked at runtime.
+
+Frequency lists are tab-separated UTF-8 text files. Blank lines and lines
+that start with ``#`` are skipped. Each line is formatted in one of two ways:
+
+* ``TEXT<TAB>READING<TAB>COUNT``: *READING* of *TEXT* was seen *COUNT* times.
+  *READING* is accented or numbered Pinyin. The count is also added to the
+  readings of the characters of multi-character words.
+* ``WORD<TAB>COUNT``: *WORD* was seen *COUNT* times. If *WORD* has more than
+  one character and only one reading, the count is added to the readings of
+  its characters.
+
+Readings that aren't in any frequency list keep their relative order after
+the readings that are.
+
+To write reranked copies of the data files::
+
+    python -m dragonmapper.ranking FREQUENCIES.tsv --output DIRECTORY
+
+To write only the reranked entries as a user dictionary that can be loaded
+with :func:`dragonmapper.hanzi.load_dictionary`::
+
+    python -m dragonmapper.ranking FREQUENCIES.tsv --dictionary RANKED.tsv
+
+"""
+
+import argparse
+import os
+from collections import Counter, defaultdict
+
+import dragonmapper.data
+from dragonmapper import hanzi
+from dragonmapper.transcriptions import numbered_to_accented
+
+# The data files that are ranked.
+DATA_FILES = ("hanzi_pinyin_characters.tsv", "hanzi_pinyin_words.tsv")
+
+
+def _reading_key(reading):
+    """Return a form of *reading* for comparing readings with each other."""
+    return reading.lower().replace("'", "").replace(" ", "")
+
+
+def load_data(directory=None):
+    """Load the data files that are ranked.
+
+    A dictionary is returned formatted like this:
+    ``{FILE_NAME: {HANZI: [READING, ...], ...}, ...}``. Entries are in the
+    same order as the file's lines. If *directory* is ``None``, the built-in
+    data files are loaded.
+
+    """
+    data = {}
+    for file_name in DATA_FILES:
+        if directory is None:
+            lines = dragonmapper.data.load_data_file(file_name)
+        else:
+            with open(os.path.join(directory, file_name), encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        data[file_name] = hanzi._parse_data(lines)
+    return data
+
+
+def count_readings(lines, data):
+    """Count how often each reading is used according to a frequency list.
+
+    *lines* are the lines of a frequency list and *data* is the return value
+    of :func:`load_data`. A dictionary is returned formatted like this:
+    ``{HANZI: Counter({READING_KEY: COUNT, ...}), ...}``.
+
+    """
+    characters = data["hanzi_pinyin_characters.tsv"]
+    words = data["hanzi_pinyin_words.tsv"]
+    counts = defaultdict(Counter)
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = line.rstrip("\r\n").split("\t")
+        try:
+            count = int(fields[-1])
+        except ValueError:
+            raise ValueError(
+                "Invalid count on line {}: {}".format(line_number, line.strip())
+            )
+        if len(fields) == 3:
+            text, reading = fields[0], fields[1]
+            if any(c.isdigit() for c in reading):
+                reading = numbered_to_accented(reading)
+        elif len(fields) == 2:
+            text = fields[0]
+            readings = words.get(text)
+            if len(text) < 2 or readings is None or len(readings) > 1:
+                continue
+            reading = readings[0]
+        else:
+            raise ValueError(
+                "Invalid frequency list line {}: {}".format(line_number, line.strip())
+            )
+        counts[text][_reading_key(reading)] += count
+        if len(text) > 1:
+            syllables = hanzi._align_reading(text, _reading_key(reading), characters)
+            for character, syllable in zip(text, syllables or ()):
+                counts[character][_reading_key(syllable)] += count
+    return counts
+
+
+def rank_readings(data, counts):
+    """Reorder the readings in *data* by the counts in *counts*.
+
+    *data* is the return value of :func:`load_data` and *counts* is the
+    return value of :func:`count_readings`. A tuple is returned formatted like
+    this: (RANKED_DATA, CHANGED). RANKED_DATA has the same format as *data*
+    and CHANGED is ``{FILE_NAME: {HANZI: [READING, ...], ...}, ...}`` with
+    only the entries whose order changed.
+
+    """
+    ranked, changed = {}, {}
+    for file_name, entries in data.items():
+        ranked[file_name], changed[file_name] = {}, {}
+        for text, readings in entries.items():
+            text_counts = counts.get(text)
+            if text_counts and len(readings) > 1:
+                new_readings = sorted(
+                    readings, key=lambda r: -text_counts[_reading_key(r)]
+                )
+                if new_readings != readings:
+                    changed[file_name][text] = new_readings
+                readings = new_readings
+            ranked[file_name][text] = readings
+    return ranked, changed
+
+
+def _write_entries(path, entries):
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for text, readings in entries.items():
+            f.write("{}\t{}\n".format(text, hanzi._READING_SEPARATOR.join(readings)))
+
+
+def main(argv=None):
+    """Run the command-line tool."""
+    parser = argparse.ArgumentParser(
+        prog="python -m dragonmapper.ranking",
+        description="Rank the readings in the dictionaries by frequency.",
+    )
+    parser.add_argument("frequency_lists", nargs="+", metavar="FREQUENCY_LIST")
+    parser.add_argument(
+        "--data", metavar="DIRECTORY", help="rank these data files instead"
+    )
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument(
+        "--output", metavar="DIRECTORY", help="write ranked data files here"
+    )
+    output.add_argument(
+        "--dictionary", metavar="FILE", help="write the changes as a user dictionary"
+    )
+    args = parser.parse_args(argv)
+
+    data = load_data(args.data)
+    counts = defaultdict(Counter)
+    for filename in args.frequency_lists:
+        with open(filename, encoding="utf-8") as f:
+            for text, text_counts in count_readings(f, data).items():
+                counts[text].update(text_counts)
+    ranked, changed = rank_readings(data, counts)
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for file_name, entries in ranked.items():
+            _write_entries(os.path.join(args.output, file_name), entries)
+    else:
+        entries = {}
+        for file_name in DATA_FILES:
+            entries.update(changed[file_name])
+        _write_entries(args.dictionary, entries)
+    for file_name in DATA_FILES:
+        print("{}: {} entries reranked".format(file_name, len(changed[file_name])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""A local conversion server that keeps the dictionaries loaded.
+
+Requests and responses are JSON objects, one per line, sent over a Unix
+socket or a localhost TCP connection. A request names a conversion function
+and the text to convert::
+
+    {"id": 1, "function": "to_pinyin", "text": "你好", "options": {}}
+
+The response echoes the request's *id* and has either a *result* or an
+*error*::
+
+    {"id": 1, "result": "nǐhǎo"}
+
+Requests that arrive close together are converted together in one batch.
+A request line can be at most 1 MiB long by default; see :class:`Server`.
+A request for the ``"stats"`` function returns the number of requests and
+batches handled so far and the server-side latency percentiles.
+
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from dragonmapper import hanzi, transcriptions
+
+# The functions that requests can call, by name.
+FUNCTIONS = {
+    "to_pinyin": hanzi.to_pinyin,
+    "to_zhuyin": hanzi.to_zhuyin,
+    "to_ipa": hanzi.to_ipa,
+    "numbered_to_accented": transcriptions.numbered_to_accented,
+    "accented_to_numbered": transcriptions.accented_to_numbered,
+    "pinyin_to_zhuyin": transcriptions.pinyin_to_zhuyin,
+    "pinyin_to_ipa": transcriptions.pinyin_to_ipa,
+    "zhuyin_to_pinyin": transcriptions.zhuyin_to_pinyin,
+    "zhuyin_to_ipa": transcriptions.zhuyin_to_ipa,
+    "ipa_to_zhuyin": transcriptions.ipa_to_zhuyin,
+    "ipa_to_pinyin": transcriptions.ipa_to_pinyin,
+    "normalize_pinyin": transcriptions.normalize_pinyin,
+}
+
+# Options that don't return JSON-compatible values.
+_UNSUPPORTED_OPTIONS = frozenset(("writer", "offsets"))
+
+# Unexpected errors that fail a request instead of stopping the server.
+_INTERNAL_ERRORS = (
+    ArithmeticError,
+    AttributeError,
+    LookupError,
+    NameError,
+    RuntimeError,
+)
+
+_PERCENTILES = (50, 90, 99)
+
+# How long a response line that a client reads can be. A response can be
+# several times longer than its request.
+_RESPONSE_LIMIT = 2**24
+
+# The default text for the load generator.
+_SAMPLE_TEXTS = (
+    "我住在美国。",
+    "你好，你是哪国人？",
+    "他们在图书馆学习中文。",
+    "我們現在去吃飯吧。",
+    "展览馆明天不开门。",
+    "一个人在北京工作不容易。",
+)
+
+
+def percentiles(latencies, points=_PERCENTILES):
+    """Return the nearest-rank percentiles of *latencies* in milliseconds.
+
+    A dictionary is returned formatted like this:
+    ``{'p50': 0.4, 'p90': 1.2, 'p99': 2.5, 'max': 3.1}``. If *latencies* is
+    empty, every value is ``None``.
+
+    """
+    ordered = sorted(latencies)
+    result = {}
+    for point in points:
+        if ordered:
+            rank = max(0, -(-point * len(ordered) // 100) - 1)
+            result["p{}".format(point)] = round(ordered[rank] * 1000, 3)
+        else:
+            result["p{}".format(point)] = None
+    result["max"] = round(ordered[-1] * 1000, 3) if ordered else None
+    return result
+
+
+def _check(request):
+    """Return why a decoded request can't be converted, or ``None``."""
+    function = request.get("function")
+    options = request.get("options") or {}
+    if not isinstance(function, str) or function not in FUNCTIONS:
+        return "Unknown function: {}".format(function)
+    if not isinstance(request.get("text"), str):
+        return "The request's text must be a string."
+    if not isinstance(options, dict) or _UNSUPPORTED_OPTIONS.intersection(options):
+        return "Unsupported options: {}".format(options)
+    return None
+
+
+def _convert(request):
+    """Convert a decoded request and return its response."""
+    response = {"id": request.get("id")}
+    error = _check(request)
+    if error is not None:
+        response["error"] = error
+        return response
+    function = FUNCTIONS[request["function"]]
+    try:
+        response["result"] = function(request["text"], **request.get("options") or {})
+    except (TypeError, ValueError) as e:
+        response["error"] = str(e)
+    except _INTERNAL_ERRORS as e:
+        # A bug in a conversion function only fails its own request.
+        response["error"] = "Internal error: {!r}".format(e)
+    return response
+
+
+def _convert_batch(requests):
+    """Convert a batch of decoded requests and return their responses.
+
+    Identical requests in a batch are only converted once.
+
+    """
+    cache = {}
+    responses = []
+    for request in requests:
+        if _check(request) is not None:
+            responses.append(_convert(request))
+            continue
+        key = (
+            request["function"],
+            request["text"],
+            json.dumps(request.get("options") or {}, sort_keys=True),
+        )
+        if key not in cache:
+            cache[key] = _convert(dict(request, id=None))
+        responses.append(dict(cache[key], id=request.get("id")))
+    return responses
+
+
+class Server:
+    """A conversion server that batches concurrent requests.
+
+    Requests are converted on a worker thread while the event loop keeps
+    reading new ones, so the requests that arrive during a conversion form
+    the next batch of up to *batch_size* requests. If *batch_delay* is more
+    than ``0``, the server also waits that many seconds after the first
+    request of a batch arrives, which makes batches larger at the cost of
+    latency. The latencies of the last *window* requests are kept for the
+    percentiles.
+
+    A request line can be at most *limit* bytes long. A longer one is
+    answered with an error and its connection is closed.
+
+    """
+
+    def __init__(self, batch_size=64, batch_delay=0, window=10000, limit=2**20):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.limit = limit
+        self.requests = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=window)
+        self._queue = None
+        self._batcher = None
+        self._connections = {}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def stats(self):
+        """Return the request and batch counts and the latency percentiles."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "latency_ms": percentiles(self.latencies),
+        }
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """Start listening on *path* if it's given, or on *host* and *port*.
+
+        The :class:`asyncio.Server` is returned.
+
+        """
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.ensure_future(self._process_batches())
+        if path is not None:
+            return await asyncio.start_unix_server(
+                self._handle, path=path, limit=self.limit
+            )
+        return await asyncio.start_server(self._handle, host, port, limit=self.limit)
+
+    async def close(self):
+        """Close the connections and shut down the batches and worker thread.
+
+        Requests that were already read are answered before their connection
+        is closed.
+
+        """
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections)
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        self._executor.shutdown()
+
+    async def _handle(self, reader, writer):
+        """Read a connection's requests and answer them in order."""
+        handler = asyncio.current_task()
+        self._connections[handler] = writer
+        responses = asyncio.Queue()
+        responder = asyncio.ensure_future(self._respond(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                responses.put_nowait(self._submit(line))
+        except ConnectionError:
+            pass
+        except ValueError:
+            # The line is longer than the limit and the rest of it can't be
+            # told apart from the next request.
+            error = "A request can be at most {} bytes long.".format(self.limit)
+            responses.put_nowait(self._error(None, error))
+        finally:
+            responses.put_nowait(None)
+            await responder
+            del self._connections[handler]
+
+    async def _respond(self, responses, writer):
+        """Write the responses of a connection as they're completed."""
+        try:
+            while True:
+                response = await responses.get()
+                if response is None:
+                    break
+                response = await response
+                writer.write(json.dumps(response, ensure_ascii=False).encode())
+                writer.write(b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _error(self, request_id, message):
+        """Return a future that's completed with an error response."""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result({"id": request_id, "error": message})
+        return future
+
+    def _submit(self, line):
+        """Queue a request line for the next batch and return a future."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object.")
+        except ValueError as e:
+            return self._error(None, str(e))
+        future = asyncio.get_running_loop().create_future()
+        if request.get("function") == "stats":
+            future.set_result(dict(self.stats(), id=request.get("id")))
+            return future
+        self._queue.put_nowait((time.perf_counter(), request, future))
+        return future
+
+    async def _process_batches(self):
+        """Collect queued requests into batches and convert them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            requests = [request for _, request, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, _convert_batch, requests
+                )
+            except _INTERNAL_ERRORS as e:
+                # Answer the batch instead of leaving its requests waiting.
+                error = "Internal error: {!r}".format(e)
+                results = [{"id": r.get("id"), "error": error} for r in requests]
+            now = time.perf_counter()
+            self.batches += 1
+            self.requests += len(batch)
+            for (received, _, future), result in zip(batch, results):
+                self.latencies.append(now - received)
+                future.set_result(result)
+
+
+async def _connect(host="127.0.0.1", port=8765, path=None):
+    if path is not None:
+        return await asyncio.open_unix_connection(path, limit=_RESPONSE_LIMIT)
+    return await asyncio.open_connection(host, port, limit=_RESPONSE_LIMIT)
+
+
+async def request(reader, writer, function, text="", **options):
+    """Send one request over an open connection and return its response."""
+    message = {"function": function, "text": text, "options": options}
+    writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def generate_load(
+    texts=_SAMPLE_TEXTS,
+    requests=1000,
+    concurrency=16,
+    function="to_pinyin",
+    host="127.0.0.1",
+    port=8765,
+    path=None,
+    seed=0,
+):
+    """Send *requests* random texts over *concurrency* connections.
+
+    Each connection sends one request at a time. A dictionary is returned
+    with the number of requests, errors, requests per second, the
+    client-side latency percentiles, and the server's own :meth:`Server.stats`.
+
+    """
+    rng = random.Random(seed)
+    work = [rng.choice(texts) for _ in range(requests)]
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        reader, writer = await _connect(host, port, path)
+        try:
+            while work:
+                text = work.pop()
+                started = time.perf_counter()
+                response = await request(reader, writer, function, text)
+                latencies.append(time.perf_counter() - started)
+                errors += "error" in response
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await _connect(host, port, path)
+    try:
+        server_stats = await request(reader, writer, "stats")
+    finally:
+        writer.close()
+    del server_stats["id"]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": percentiles(latencies),
+        "server": server_stats,
+    }
+
+
+async def _serve(args):
+    server = Server(batch_size=args.batch_size, batch_delay=args.batch_delay)
+    listener = await server.start(args.host, args.port, args.unix)
+    address = args.unix or "{}:{}".format(args.host, args.port)
+    print("Serving on {}".format(address), flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+async def _load(args):
+    texts = _SAMPLE_TEXTS
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    report = await generate_load(
+        texts,
+        args.requests,
+        args.concurrency,
+        args.function,
+        args.host,
+        args.port,
+        args.unix,
+    )
+    print(json.dumps(report, indent=2))
+
+
+def main(argv=None):
+    """Run the ``serve`` or ``loadgen`` command-line commands."""
+    parser = argparse.ArgumentParser(prog="python -m dragonmapper")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the conversion server")
+    loadgen = commands.add_parser("loadgen", help="send requests to a server")
+    for command in (serve, loadgen):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=8765)
+        command.add_argument("--unix", metavar="PATH", help="use a Unix socket")
+    serve.add_argument("--batch-size", type=int, default=64)
+    serve.add_argument(
+        "--batch-delay",
+        type=float,
+        default=0,
+        help="seconds to wait for more requests before converting a batch",
+    )
+    loadgen.add_argument("--requests", type=int, default=1000)
+    loadgen.add_argument("--concurrency", type=int, default=16)
+    loadgen.add_argument("--function", default="to_pinyin", choices=FUNCTIONS)
+    loadgen.add_argument("--file", help="a file with one text to send per line")
+
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args) if args.command == "serve" else _load(args))
+    except KeyboardInterrupt:
+        pass
@@ -2,6 +2,10 @@
 """Identification and conversion functions for Chinese transcriptions."""
 
 import re
+import unicodedata
+from array import array
+from collections import deque
+from itertools import repeat
 
 import zhon.pinyin
 import zhon.zhuyin
@@ -63,6 +67,24 @@ _IPA_SYLLABLE = "[{characters}]+[{marks}]*".format(
     characters=_IPA_CHARACTERS, marks=_IPA_MARKS
 )
 
+# Runs of letters and tones that are expected to be made up of syllables.
+_PINYIN_RUN = "[a-z{letters}][a-z{letters}0-5]*".format(letters=zhon.pinyin.lowercase)
+_ZHUYIN_RUN = "[{characters}{marks}]+".format(
+    characters=zhon.zhuyin.characters, marks=zhon.zhuyin.marks
+)
+_IPA_RUN = "[a-z{characters}][a-z{characters}{marks}]*".format(
+    characters=_IPA_CHARACTERS, marks=_IPA_MARKS
+)
+_SYLLABLE_RUNS = {
+    zhon.pinyin.syllable: _PINYIN_RUN,
+    zhon.zhuyin.syllable: _ZHUYIN_RUN,
+    _IPA_SYLLABLE: _IPA_RUN,
+}
+
+# Accepted values for the sentence-style converters' *errors* argument.
+_ERRORS = ("strict", "keep", "replace")
+_REPLACEMENT_CHARACTER = "\ufffd"
+
 
 def _load_data():
     """Load the transcription mapping data into a dictionary."""
@@ -176,17 +198,43 @@ def _parse_ipa_syllable(unparsed_syllable):
             if ipa_tone.group() == tone_mark:
                 tone = tone_number
                 break
+        else:
+            raise ValueError("Invalid tone: {}".format(ipa_tone.group()))
         syllable = unparsed_syllable[0 : ipa_tone.start()]
     return syllable, tone
 
 
+# Whole-string case memories returned by _lower_case().
+_LOWERCASE = "lowercase"
+_UPPERCASE = "uppercase"
+_TITLECASE = "titlecase"
+
+
 def _lower_case(s):
-    """Convert a string to lowercase and remember its original case."""
-    return s.lower(), [c.islower() for c in s]
+    """Convert a string to lowercase and remember its original case.
+
+    All-lowercase, all-uppercase, and title-case strings are remembered as a
+    whole. Otherwise, the case of each character is remembered.
+
+    """
+    if s.islower():
+        return s, _LOWERCASE
+    lowercase_s = s.lower()
+    if s.isupper():
+        return lowercase_s, _UPPERCASE
+    if s[:1].isupper() and s[1:] == lowercase_s[1:]:
+        return lowercase_s, _TITLECASE
+    return lowercase_s, [c.islower() for c in s]
 
 
 def _restore_case(s, memory):
     """Restore a lowercase string's characters to their original case."""
+    if memory is _LOWERCASE:
+        return s
+    elif memory is _UPPERCASE:
+        return s.upper()
+    elif memory is _TITLECASE:
+        return s[:1].upper() + s[1:]
     cased_s = []
     for i, c in enumerate(s):
         if i + 1 > len(memory):
@@ -331,65 +379,224 @@ def ipa_syllable_to_zhuyin(s):
     return pinyin_syllable_to_zhuyin(numbered_pinyin)
 
 
-def _convert(
+def _iter_syllables(s, re_pattern, check_runs=False):
+    """Yield the spans of the syllables in *s* that match *re_pattern*.
+
+    Tuples formatted like this are yielded in order: (START, END, MATCHED).
+    If *check_runs* is ``True``, runs of letters that aren't made up of
+    syllables are yielded whole with MATCHED set to ``False`` instead of the
+    syllables inside them.
+
+    """
+    flags = re.IGNORECASE | re.UNICODE
+    invalid_runs = deque()
+    if check_runs:
+        for run in re.finditer(_SYLLABLE_RUNS[re_pattern], s, flags):
+            matched = sum(
+                len(match.group())
+                for match in re.finditer(re_pattern, run.group(), flags)
+            )
+            if matched < len(run.group()):
+                invalid_runs.append(run.span())
+    for match in re.finditer(re_pattern, s, flags):
+        start, end = match.span()
+        while invalid_runs and invalid_runs[0][1] <= start:
+            yield invalid_runs.popleft() + (False,)
+        if invalid_runs and invalid_runs[0][0] < end:
+            continue
+        yield start, end, True
+    for run in invalid_runs:
+        yield run + (False,)
+
+
+def _iter_convert(
     s,
     re_pattern,
     syllable_function,
-    add_apostrophes=False,
-    remove_apostrophes=False,
-    separate_syllables=False,
+    add_apostrophes,
+    remove_apostrophes,
+    separate_syllables,
+    offsets=None,
+    errors="strict",
 ):
-    """Convert a string's syllables to a different transcription system."""
-    original = s
-    new = ""
-    while original:
-        match = re.search(re_pattern, original, re.IGNORECASE | re.UNICODE)
-        if match is None and original:
-            # There are no more matches, but the given string isn't fully
-            # processed yet.
-            new += original
-            break
-        match_start, match_end = match.span()
-        if match_start > 0:  # Handle extra characters before matched syllable.
-            if new and remove_apostrophes and match_start == 1 and original[0] == "'":
-                pass  # Remove the apostrophe between Pinyin syllables.
+    """Yield the fragments of a string converted by :func:`_convert`.
+
+    Text between syllables is yielded as slices of *s*. If *offsets* is an
+    array, the output offset of each character in *s* is appended to it.
+    Syllables that can't be converted are handled according to *errors*.
+
+    """
+    position = 0
+    length = 0  # The length of the output so far, if offsets are needed.
+    converted = False  # Whether a syllable has been converted yet.
+    check_runs = errors != "strict"
+    for match_start, match_end, matched in _iter_syllables(s, re_pattern, check_runs):
+        text = s[match_start:match_end]
+        if match_start > position:  # Handle extra characters before matched syllable.
+            if (
+                converted
+                and remove_apostrophes
+                and match_start == position + 1
+                and s[position] == "'"
+            ):
+                # Remove the apostrophe between Pinyin syllables.
+                if offsets is not None:
+                    offsets.append(length)
                 if separate_syllables:  # Separate syllables by a space.
-                    new += " "
+                    yield " "
+                    length += 1
             else:
-                new += original[0:match_start]
+                if offsets is not None:
+                    offsets.extend(range(length, length + match_start - position))
+                    length += match_start - position
+                yield s[position:match_start]
         else:  # Matched syllable starts immediately.
-            if new and separate_syllables:  # Separate syllables by a space.
-                new += " "
+            if converted and separate_syllables:  # Separate syllables by a space.
+                yield " "
+                length += 1
             elif (
-                new
-                and add_apostrophes
-                and match.group()[0].lower() in _UNACCENTED_VOWELS
+                converted and add_apostrophes and text[0].lower() in _UNACCENTED_VOWELS
             ):
-                new += "'"
+                yield "'"
+                length += 1
         # Convert the matched syllable.
-        new += syllable_function(match.group())
-        original = original[match_end:]
-    return new
+        try:
+            if not matched:
+                raise ValueError("Not a syllable: {}".format(text))
+            syllable = syllable_function(text)
+        except ValueError:
+            if errors == "strict":
+                raise
+            elif errors == "keep":
+                syllable = text
+            else:
+                syllable = _REPLACEMENT_CHARACTER
+        if offsets is not None:
+            offsets.extend(repeat(length, match_end - match_start))
+            length += len(syllable)
+        yield syllable
+        converted = True
+        position = match_end
+    if position < len(s):
+        if offsets is not None:
+            offsets.extend(range(length, length + len(s) - position))
+            length += len(s) - position
+        yield s[position:]
+    if offsets is not None:
+        offsets.append(length)
+
+
+def _convert(
+    s,
+    re_pattern,
+    syllable_function,
+    add_apostrophes=False,
+    remove_apostrophes=False,
+    separate_syllables=False,
+    writer=None,
+    offsets=False,
+    errors="strict",
+):
+    """Convert a string's syllables to a different transcription system.
+
+    *errors* decides what happens to syllables that can't be converted:
+    ``'strict'`` raises :exc:`ValueError`, ``'keep'`` leaves them unchanged,
+    and ``'replace'`` replaces them with U+FFFD REPLACEMENT CHARACTER.
+
+    If *writer* is given, the converted string is written to it one fragment
+    at a time and ``None`` is returned in its place.
+
+    If *offsets* is ``True``, a tuple is returned formatted like this:
+    (CONVERTED_STRING, OFFSETS). OFFSETS is an ``array('I')`` that contains
+    the offset in the converted string where each character of *s* was
+    converted to, followed by the converted string's length.
 
+    """
+    if errors not in _ERRORS:
+        raise ValueError("Invalid errors value: {}".format(errors))
+    offset_table = array("I") if offsets else None
+    fragments = _iter_convert(
+        s,
+        re_pattern,
+        syllable_function,
+        add_apostrophes,
+        remove_apostrophes,
+        separate_syllables,
+        offset_table,
+        errors,
+    )
+    if writer is None:
+        converted = "".join(fragments)
+    else:
+        write = writer.write
+        for fragment in fragments:
+            write(fragment)
+        converted = None
+    return (converted, offset_table) if offsets else converted
 
-def numbered_to_accented(s):
-    """Convert all numbered Pinyin syllables in *s* to accented Pinyin."""
+
+def numbered_to_accented(s, writer=None, offsets=False, errors="strict"):
+    """Convert all numbered Pinyin syllables in *s* to accented Pinyin.
+
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
+
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
+
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
+    """
     return _convert(
-        s, zhon.pinyin.syllable, numbered_syllable_to_accented, add_apostrophes=True
+        s,
+        zhon.pinyin.syllable,
+        numbered_syllable_to_accented,
+        add_apostrophes=True,
+        writer=writer,
+        offsets=offsets,
+        errors=errors,
     )
 
 
-def accented_to_numbered(s):
-    """Convert all accented Pinyin syllables in *s* to numbered Pinyin."""
-    return _convert(s, zhon.pinyin.syllable, accented_syllable_to_numbered)
+def accented_to_numbered(s, writer=None, offsets=False, errors="strict"):
+    """Convert all accented Pinyin syllables in *s* to numbered Pinyin.
 
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
 
-def pinyin_to_zhuyin(s):
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
+
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
+    """
+    return _convert(
+        s,
+        zhon.pinyin.syllable,
+        accented_syllable_to_numbered,
+        writer=writer,
+        offsets=offsets,
+        errors=errors,
+    )
+
+
+def pinyin_to_zhuyin(s, writer=None, offsets=False, errors="strict"):
     """Convert all Pinyin syllables in *s* to Zhuyin.
 
     Spaces are added between connected syllables and syllable-separating
     apostrophes are removed.
 
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
+
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
+
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
     """
     return _convert(
         s,
@@ -397,15 +604,27 @@ def pinyin_to_zhuyin(s):
         pinyin_syllable_to_zhuyin,
         remove_apostrophes=True,
         separate_syllables=True,
+        writer=writer,
+        offsets=offsets,
+        errors=errors,
     )
 
 
-def pinyin_to_ipa(s):
+def pinyin_to_ipa(s, writer=None, offsets=False, errors="strict"):
     """Convert all Pinyin syllables in *s* to IPA.
 
     Spaces are added between connected syllables and syllable-separating
     apostrophes are removed.
 
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
+
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
+
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
     """
     return _convert(
         s,
@@ -413,45 +632,111 @@ def pinyin_to_ipa(s):
         pinyin_syllable_to_ipa,
         remove_apostrophes=True,
         separate_syllables=True,
+        writer=writer,
+        offsets=offsets,
+        errors=errors,
     )
 
 
-def zhuyin_to_pinyin(s, accented=True):
+def zhuyin_to_pinyin(s, accented=True, writer=None, offsets=False, errors="strict"):
     """Convert all Zhuyin syllables in *s* to Pinyin.
 
     If *accented* is ``True``, diacritics are added to the Pinyin syllables. If
     it's ``False``, numbers are used to indicate tone.
 
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
+
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
+
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
     """
     if accented:
         function = _zhuyin_syllable_to_accented
     else:
         function = _zhuyin_syllable_to_numbered
-    return _convert(s, zhon.zhuyin.syllable, function)
+    return _convert(
+        s,
+        zhon.zhuyin.syllable,
+        function,
+        writer=writer,
+        offsets=offsets,
+        errors=errors,
+    )
+
 
+def zhuyin_to_ipa(s, writer=None, offsets=False, errors="strict"):
+    """Convert all Zhuyin syllables in *s* to IPA.
 
-def zhuyin_to_ipa(s):
-    """Convert all Zhuyin syllables in *s* to IPA."""
-    return _convert(s, zhon.zhuyin.syllable, zhuyin_syllable_to_ipa)
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
 
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
 
-def ipa_to_pinyin(s, accented=True):
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
+    """
+    return _convert(
+        s,
+        zhon.zhuyin.syllable,
+        zhuyin_syllable_to_ipa,
+        writer=writer,
+        offsets=offsets,
+        errors=errors,
+    )
+
+
+def ipa_to_pinyin(s, accented=True, writer=None, offsets=False, errors="strict"):
     """Convert all IPA syllables in *s* to Pinyin.
 
     If *accented* is ``True``, diacritics are added to the Pinyin syllables. If
     it's ``False``, numbers are used to indicate tone.
 
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
+
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
+
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
     """
     if accented:
         function = _ipa_syllable_to_accented
     else:
         function = _ipa_syllable_to_numbered
-    return _convert(s, _IPA_SYLLABLE, function)
+    return _convert(
+        s, _IPA_SYLLABLE, function, writer=writer, offsets=offsets, errors=errors
+    )
 
 
-def ipa_to_zhuyin(s):
-    """Convert all IPA syllables in *s* to Zhuyin."""
-    return _convert(s, _IPA_SYLLABLE, ipa_syllable_to_zhuyin)
+def ipa_to_zhuyin(s, writer=None, offsets=False, errors="strict"):
+    """Convert all IPA syllables in *s* to Zhuyin.
+
+    If *writer* is given, the result is written to it instead of being
+    returned. It can be any object with a ``write`` method, e.g. a text file.
+
+    If *offsets* is ``True``, a tuple (RESULT, OFFSETS) is returned, where
+    OFFSETS maps positions in *s* to positions in the result. See
+    :ref:`offsets`.
+
+    *errors* decides what happens to invalid syllables. See :ref:`errors`.
+
+    """
+    return _convert(
+        s,
+        _IPA_SYLLABLE,
+        ipa_syllable_to_zhuyin,
+        writer=writer,
+        offsets=offsets,
+        errors=errors,
+    )
 
 
 def to_pinyin(s, accented=True):
@@ -501,6 +786,119 @@ def to_ipa(s):
         raise ValueError("String is not a valid Chinese transcription.")
 
 
+# Full-width letters and digits: {FULL_WIDTH_CODE_POINT: ASCII_CODE_POINT}.
+_FULL_WIDTH_TABLE = {
+    code_point: code_point - 0xFEE0
+    for code_point in range(0xFF10, 0xFF5B)
+    if chr(code_point - 0xFEE0).isalnum()
+}
+
+_PINYIN_LETTERS = frozenset(
+    "abcdefghijklmnopqrstuvwxyz\u00fcABCDEFGHIJKLMNOPQRSTUVWXYZ\u00dc"
+)
+
+_FULL_WIDTH_PATTERN = re.compile("[\uff10-\uff5a]")
+
+_PINYIN_VARIANT_PATTERN = re.compile(
+    # A tone number placed after the vowel it marks instead of the syllable.
+    "([0-5])(?<=[aeiou\u00fcAEIOU\u00dc].)([nN][gG]|[nriouNRIOU])"
+    "(?![aeiouv\u00fcAEIOUV\u00dc0-5])"
+    # 'v' or 'u:' used instead of 'ü'.
+    "|([vV]|[uU][:\uff1a])(?=[enEN]?(?:[0-5]|(?![a-zA-Z\u00fc\u00dc])))"
+)
+
+
+def _pinyin_syllable_starts(s, i):
+    """Return the possible starts of a Pinyin syllable that contains ``s[i]``.
+
+    A syllable starts after a non-letter. If that's a tone number, the
+    previous syllable's ending may have been placed after it, e.g. the 'ng'
+    in 'zho1ngguo2', so the positions after possible endings are returned as
+    well.
+
+    """
+    start = i
+    while start > 0 and s[start - 1] in _PINYIN_LETTERS:
+        start -= 1
+    starts = [start]
+    if start > 0 and s[start - 1] in "012345":
+        if start + 2 <= i and s[start : start + 2].lower() == "ng":
+            starts.append(start + 2)
+        if start + 1 <= i and s[start].lower() in "nriou":
+            starts.append(start + 1)
+    return starts
+
+
+def _normalize_pinyin_variant(match):
+    """Return the normalized form of a match of the Pinyin variant pattern.
+
+    Variants that aren't part of a valid syllable are returned unchanged.
+
+    """
+    tone, ending, umlaut = match.groups()
+    s, start = match.string, match.start()
+    if umlaut is not None:
+        # 'ü' only follows 'l' or 'n' at the start of a syllable.
+        if start > 0 and s[start - 1] in "lnLN":
+            if start - 1 in _pinyin_syllable_starts(s, start - 1):
+                return "\u00fc" if umlaut[0] in "uv" else "\u00dc"
+        return match.group()
+    for syllable_start in _pinyin_syllable_starts(s, start - 1):
+        syllable = s[syllable_start:start] + ending
+        if syllable.lower() in _PINYIN_MAP:
+            return ending + tone
+    return match.group()
+
+
+def normalize_pinyin(s):
+    """Convert common variants of Pinyin in *s* to standard Pinyin.
+
+    The following variants are normalized:
+
+    * Full-width letters and digits, e.g. ``'ｎｉ３'``, are converted to ASCII.
+    * Decomposed vowels, e.g. ``'u'`` followed by a combining diaeresis, are
+      composed.
+    * ``'v'`` and ``'u:'`` after ``'l'`` or ``'n'`` are converted to ``'ü'``,
+      e.g. ``'lv4'`` and ``'lu:4'`` become ``'lü4'``.
+    * Tone numbers placed after the vowel they mark are moved to the end of
+      the syllable, e.g. ``'zho1ng'`` becomes ``'zhong1'``.
+
+    Only syllables that begin after a non-letter, e.g. a space, a tone number,
+    or an apostrophe, are normalized. Everything else is left unchanged.
+
+    """
+    if _FULL_WIDTH_PATTERN.search(s):
+        s = s.translate(_FULL_WIDTH_TABLE)
+    if not unicodedata.is_normalized("NFC", s):
+        s = unicodedata.normalize("NFC", s)
+    return _PINYIN_VARIANT_PATTERN.sub(_normalize_pinyin_variant, s)
+
+
+def normalize_pinyin_stream(chunks):
+    """Normalize Pinyin that's split into chunks, e.g. a file's lines.
+
+    *chunks* is an iterable of strings. The normalized chunks are yielded as
+    they're processed, so the whole text never needs to be in memory. Chunks
+    are only split at whitespace, so syllables that are split between chunks
+    are normalized correctly. See :func:`normalize_pinyin`.
+
+    """
+    # Only the new chunk is searched for whitespace, so that text without
+    # whitespace doesn't make each chunk take longer than the last.
+    pending = []
+    for chunk in chunks:
+        split = max(chunk.rfind(" "), chunk.rfind("\n"), chunk.rfind("\t"))
+        if split < 0:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[: split + 1])
+        yield normalize_pinyin("".join(pending))
+        pending = [chunk[split + 1 :]]
+    pending = "".join(pending)
+    if pending:
+        yield normalize_pinyin(pending)
+
+
 def _is_pattern_match(re_pattern, s):
     """Check if a re pattern expression matches an entire string."""
     match = re.match(re_pattern, s, re.I)
@@ -557,6 +955,57 @@ def is_ipa(s):
     return _is_pattern_match(re_pattern, s)
 
 
+def _find_invalid_syllables(re_pattern, syllable_function, s):
+    """Return the syllables in *s* that *syllable_function* can't convert.
+
+    Runs of letters that aren't made up of syllables are returned whole.
+
+    """
+    invalid = []
+    for start, end, matched in _iter_syllables(s, re_pattern, check_runs=True):
+        syllable = s[start:end]
+        try:
+            if not matched:
+                raise ValueError("Not a syllable: {}".format(syllable))
+            syllable_function(syllable)
+        except ValueError as e:
+            invalid.append((start, syllable, str(e)))
+    return invalid
+
+
+def validate_pinyin(s):
+    """Find all invalid Pinyin syllables in *s*.
+
+    A list of tuples is returned, one for each syllable that can't be
+    converted, formatted like this: (POSITION, SYLLABLE, REASON). POSITION is
+    the syllable's index in *s*. A run of letters that can't be split into
+    syllables, like ``'xyz'``, is returned as one syllable. An empty list
+    means that every syllable is valid.
+
+    """
+    return _find_invalid_syllables(zhon.pinyin.syllable, pinyin_syllable_to_zhuyin, s)
+
+
+def validate_zhuyin(s):
+    """Find all invalid Zhuyin syllables in *s*.
+
+    The return value is formatted like :func:`validate_pinyin`'s.
+
+    """
+    return _find_invalid_syllables(
+        zhon.zhuyin.syllable, _zhuyin_syllable_to_numbered, s
+    )
+
+
+def validate_ipa(s):
+    """Find all invalid IPA syllables in *s*.
+
+    The return value is formatted like :func:`validate_pinyin`'s.
+
+    """
+    return _find_invalid_syllables(_IPA_SYLLABLE, _ipa_syllable_to_numbered, s)
+
+
 def identify(s):
     """Identify a given string's transcription system.
 
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for dragonmapper.cache."""
+
+import os
+import tempfile
+import unittest
+
+from dragonmapper import hanzi
+from dragonmapper.cache import ConversionCache
+
+
+class TestConversionCache(unittest.TestCase):
+    texts = ["我住在美国。", "你好", "愛 喜歡 愛。", "你好", "hello"]
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "cache.sqlite")
+        self.cache = ConversionCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tempdir.cleanup()
+
+    def test_convert(self):
+        expected = [hanzi.to_pinyin(text) for text in self.texts]
+        self.assertEqual(expected, self.cache.convert(self.texts))
+        self.assertEqual((0, 5), (self.cache.hits, self.cache.misses))
+        self.assertEqual(4, len(self.cache))
+        self.assertEqual(expected, self.cache.convert(self.texts))
+        self.assertEqual((5, 5), (self.cache.hits, self.cache.misses))
+        self.assertEqual(
+            [hanzi.to_zhuyin(text, sandhi=True) for text in self.texts],
+            self.cache.convert(self.texts, "zhuyin", sandhi=True),
+        )
+        self.assertEqual(
+            [hanzi.to_pinyin(text, accented=False) for text in self.texts],
+            self.cache.convert(self.texts, "numbered"),
+        )
+
+    def test_bulk_get_and_put(self):
+        self.assertEqual([None, None], self.cache.get_many(["你好", "我"]))
+        self.cache.put_many(["你好"], ["ni3hao3"], "numbered")
+        self.assertEqual([None], self.cache.get_many(["你好"]))
+        self.assertEqual(
+            ["ni3hao3", None], self.cache.get_many(["你好", "我"], "numbered")
+        )
+        self.assertEqual(
+            [None], self.cache.get_many(["你好"], "numbered", delimiter="/")
+        )
+        self.assertEqual(
+            ["ni3hao3"], self.cache.get_many(["你好"], "numbered", delimiter=" ")
+        )
+        self.assertRaises(ValueError, self.cache.put_many, ["你好"], [])
+        self.assertRaises(ValueError, self.cache.get_many, ["你好"], "wade-giles")
+        self.assertRaises(TypeError, self.cache.get_many, ["你好"], writer=None)
+
+    def test_persistence(self):
+        self.cache.convert(self.texts)
+        self.cache.close()
+        with ConversionCache(self.path) as cache:
+            cache.get_many(self.texts)
+            self.assertEqual(5, cache.hits)
+            cache.clear()
+            self.assertEqual(0, len(cache))
+
+    def test_invalidation(self):
+        self.cache.convert(["你好"])
+        fingerprint = hanzi.data_fingerprint()
+        filename = os.path.join(self.tempdir.name, "user.tsv")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write("你好\tnǐ hǎo\n")
+        hanzi.load_dictionary(filename, "test")
+        try:
+            self.assertNotEqual(fingerprint, hanzi.data_fingerprint())
+            self.assertEqual([None], self.cache.get_many(["你好"]))
+            self.assertEqual(["nǐ hǎo"], self.cache.convert(["你好"]))
+        finally:
+            hanzi.unload_dictionary("test")
+        self.assertEqual(fingerprint, hanzi.data_fingerprint())
+        self.assertEqual([None], self.cache.get_many(["你好"]))
+
+    def test_stored_transcriptions(self):
+        text = "hello 你好"
+        expected = hanzi.to_zhuyin(text)
+        self.assertEqual([expected], self.cache.convert([text], "zhuyin"))
+        hanzi.load_transcriptions()
+        try:
+            stored = hanzi.to_zhuyin(text)
+            self.assertNotEqual(expected, stored)
+            self.assertEqual([None], self.cache.get_many([text], "zhuyin"))
+            self.assertEqual([stored], self.cache.convert([text], "zhuyin"))
+        finally:
+            hanzi.unload_transcriptions()
+        self.assertEqual([expected], self.cache.convert([text], "zhuyin"))
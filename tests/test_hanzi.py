@@ -1,9 +1,18 @@
 # -*- coding: utf-8 -*-
 """Unit tests for dragonmapper.hanzi."""
 
+import functools
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
+from array import array
 
 from dragonmapper import hanzi
+from tests.timing import LinearTimeTestCase
 
 
 class TestConversionFunctions(unittest.TestCase):
@@ -48,10 +57,71 @@ class TestConversionFunctions(unittest.TestCase):
             self.npinyin_segmented_readings,
         )
 
+    def test_writer(self):
+        for function, expected in (
+            (hanzi.to_pinyin, self.apinyin),
+            (hanzi.to_zhuyin, self.zhuyin),
+            (hanzi.to_ipa, self.ipa),
+        ):
+            writer = io.StringIO()
+            self.assertIsNone(function(self.chinese, writer=writer))
+            self.assertEqual(expected, writer.getvalue())
+        writer = io.StringIO()
+        hanzi.to_pinyin(self.chinese, accented=False, writer=writer)
+        self.assertEqual(self.npinyin, writer.getvalue())
+
+    def test_offsets(self):
+        self.assertEqual(
+            (self.apinyin, array("I", [0, 2, 4, 9, 11, 12])),
+            hanzi.to_pinyin(self.chinese, offsets=True),
+        )
+        self.assertEqual(
+            (self.npinyin, array("I", [0, 3, 6, 12, 15, 16])),
+            hanzi.to_pinyin(self.chinese, accented=False, offsets=True),
+        )
+        self.assertEqual(
+            (self.zhuyin, array("I", [0, 3, 7, 12, 14, 15])),
+            hanzi.to_zhuyin(self.chinese, offsets=True),
+        )
+        self.assertEqual(
+            (self.ipa, array("I", [0, 5, 11, 16, 20, 21])),
+            hanzi.to_ipa(self.chinese, offsets=True),
+        )
+        self.assertEqual(
+            ("[piànyi/biànyí]", array("I", [0, 0, 15])),
+            hanzi.to_pinyin("便宜", all_readings=True, offsets=True),
+        )
+        writer = io.StringIO()
+        self.assertEqual(
+            (None, array("I", [0, 3, 7, 12, 14, 15])),
+            hanzi.to_zhuyin(self.chinese, writer=writer, offsets=True),
+        )
+        self.assertEqual(self.zhuyin, writer.getvalue())
+
     def test_word_readings(self):
         self.assertEqual(hanzi.to_pinyin("便宜"), "piànyi")
         self.assertEqual(hanzi.to_pinyin("便宜", all_readings=True), "[piànyi/biànyí]")
 
+    def test_disambiguate(self):
+        self.assertEqual("zhǎngjiānghěnzhǎng", hanzi.to_pinyin("长江很长"))
+        self.assertEqual(
+            "chángjiānghěnzhǎng", hanzi.to_pinyin("长江很长", disambiguate=True)
+        )
+        self.assertEqual(
+            "ㄔㄤˊ ㄐㄧㄤ ㄏㄣˇ ㄓㄤˇ", hanzi.to_zhuyin("长江很长", disambiguate=True)
+        )
+        # Word readings and the order of all readings aren't affected.
+        self.assertEqual("piànyi", hanzi.to_pinyin("便宜", disambiguate=True))
+        self.assertEqual(
+            "[zhǎng/cháng][jiāng][hěn][zhǎng/cháng]",
+            hanzi.to_pinyin("长江很长", all_readings=True, disambiguate=True),
+        )
+
+    def test_mixed_script(self):
+        self.assertEqual("hello nǐhǎo 123", hanzi.to_pinyin("hello 你好 123"))
+        self.assertEqual("ài😀ài", hanzi.to_pinyin("愛😀愛"))
+        self.assertEqual("e'ài", hanzi.to_pinyin("e愛"))
+
     def test_custom_container(self):
         apinyin = self.apinyin_readings.replace("[", "(").replace("]", ")")
         self.assertEqual(
@@ -79,3 +149,466 @@ class TestConversionFunctions(unittest.TestCase):
         self.assertEqual("nüèshā", hanzi.to_pinyin("虐殺"))
         self.assertEqual("nüèshā", hanzi.to_pinyin("虐杀"))
         self.assertEqual("ㄋㄩㄝˋ ㄕㄚ", hanzi.to_zhuyin("虐殺"))
+
+    def test_sandhi(self):
+        self.assertEqual("zhánlánguǎn", hanzi.to_pinyin("展览馆", sandhi=True))
+        self.assertEqual("zhǐ láohǔ", hanzi.to_pinyin("纸 老虎", sandhi=True))
+        self.assertEqual(
+            "wǒ hén hǎo。níhǎo", hanzi.to_pinyin("我 很 好。你好", sandhi=True)
+        )
+        self.assertEqual("yí gè rén", hanzi.to_pinyin("一 个 人", sandhi=True))
+        self.assertEqual(
+            "yi4tian1 yi2yang4 di4yi1",
+            hanzi.to_pinyin("一天 一样 第一", accented=False, sandhi=True),
+        )
+        self.assertEqual("tǒngyī guójiā", hanzi.to_pinyin("统一 国家", sandhi=True))
+        self.assertEqual("búduì bùhǎo", hanzi.to_pinyin("不对 不好", sandhi=True))
+        self.assertEqual("ㄅㄨˊ ㄕˋ", hanzi.to_zhuyin("不 是", sandhi=True))
+        self.assertEqual("ni˧˥ xɑʊ˧˩˧", hanzi.to_ipa("你好", sandhi=True))
+        self.assertEqual(
+            self.apinyin_readings,
+            hanzi.to_pinyin(self.chinese, all_readings=True, sandhi=True),
+        )
+
+    def test_word_queries(self):
+        self.assertEqual(("喜歡", ["xǐhuan"]), hanzi.longest_word(self.chinese, 1))
+        self.assertEqual((None, None), hanzi.longest_word(self.chinese, 4))
+        self.assertEqual((None, None), hanzi.longest_word(self.chinese, 5))
+        self.assertEqual(("愛", ["ài"]), hanzi.longest_word(self.chinese))
+        self.assertEqual(
+            ("中华人民共和国", ["ZhōnghuáRénmínGònghéguó"]),
+            hanzi.longest_word("中华人民共和国万岁"),
+        )
+        found = list(hanzi.iter_words("喜歡"))
+        self.assertIn(("喜歡", ["xǐhuan"]), found)
+        self.assertEqual(sorted(found), found)
+        self.assertTrue(all(word.startswith("喜歡") for word, readings in found))
+        self.assertEqual([], list(hanzi.iter_words("a")))
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "words.tsv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("喜歡愛\txǐhuan'ài\n喜歡\txǐhuān\n")
+            hanzi.load_dictionary(path)
+            try:
+                self.assertEqual(
+                    ("喜歡愛", ["xǐhuan'ài"]), hanzi.longest_word(self.chinese, 1)
+                )
+                user_found = list(hanzi.iter_words("喜歡"))
+                self.assertEqual(len(found) + 1, len(user_found))
+                self.assertIn(("喜歡", ["xǐhuān"]), user_found)
+                self.assertIn(("喜歡愛", ["xǐhuan'ài"]), user_found)
+                self.assertEqual(sorted(user_found), user_found)
+            finally:
+                hanzi.unload_dictionary(path)
+        self.assertEqual(("喜歡", ["xǐhuan"]), hanzi.longest_word(self.chinese, 1))
+
+
+class TestReadingLattice(unittest.TestCase):
+    def setUp(self):
+        self.lattice = hanzi.to_lattice(TestConversionFunctions.chinese_segmented)
+
+    def test_render(self):
+        self.assertEqual(
+            TestConversionFunctions.apinyin_segmented, self.lattice.render()
+        )
+        self.assertEqual(
+            TestConversionFunctions.npinyin_segmented_readings,
+            self.lattice.render("numbered", all_readings=True),
+        )
+        self.assertEqual(
+            hanzi.to_zhuyin(TestConversionFunctions.chinese_segmented),
+            self.lattice.render("zhuyin"),
+        )
+
+    def test_segments(self):
+        self.assertEqual(
+            [
+                ("愛", ["ㄞˋ"]),
+                (" ", None),
+                ("喜歡", ["ㄒㄧˇ ㄏㄨㄢ˙"]),
+                (" ", None),
+                ("愛", ["ㄞˋ"]),
+                ("。", None),
+            ],
+            self.lattice.segments("zhuyin"),
+        )
+
+    def test_unknown_system(self):
+        self.assertRaises(ValueError, self.lattice.render, "wade")
+        self.assertRaises(ValueError, self.lattice.segments, "wade")
+        self.assertRaises(ValueError, self.lattice.to_json, "wade")
+
+    def test_to_json(self):
+        self.assertEqual(
+            [
+                {"text": "愛", "readings": ["ài"]},
+                {"text": " ", "readings": None},
+                {"text": "喜歡", "readings": ["xǐhuan"]},
+                {"text": " ", "readings": None},
+                {"text": "愛", "readings": ["ài"]},
+                {"text": "。", "readings": None},
+            ],
+            json.loads(self.lattice.to_json()),
+        )
+
+    def test_disambiguate(self):
+        lattice = hanzi.to_lattice("长江很长", disambiguate=True)
+        self.assertEqual(["cháng", "zhǎng"], lattice.segments()[0][1])
+        self.assertEqual("chángjiānghěnzhǎng", lattice.render())
+
+
+class TestIdentifyAndConvert(unittest.TestCase):
+    def test_identify_and_convert(self):
+        for s in ("愛喜歡愛。", "爱", "你好", "车車", "hello", "、", ""):
+            identity, pinyin = hanzi.identify_and_convert(s)
+            self.assertEqual(hanzi.identify(s), identity)
+            self.assertEqual(hanzi.to_pinyin(s), pinyin)
+
+    def test_systems(self):
+        self.assertEqual(
+            (hanzi.TRAD, "ㄞˋ ㄒㄧˇ ㄏㄨㄢ˙ ㄞˋ。"),
+            hanzi.identify_and_convert("愛喜歡愛。", "zhuyin"),
+        )
+        self.assertEqual(
+            (hanzi.SIMP, "[ai4]"),
+            hanzi.identify_and_convert("爱", "numbered", all_readings=True),
+        )
+        self.assertRaises(ValueError, hanzi.identify_and_convert, "爱", "wade-giles")
+
+
+class TestConvertFile(unittest.TestCase):
+    text = (
+        "我住在美国。你好，你是哪国人？\n"
+        "展览馆 明天 不 开门\n"
+        "一 个 人 在 北京 工作。hello world\n"
+        "愛 喜歡 愛。\n"
+    ) * 20
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tempdir.name, "input.txt")
+        self.output_path = os.path.join(self.tempdir.name, "output.txt")
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            f.write(self.text)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def read_output(self):
+        with open(self.output_path, encoding="utf-8") as f:
+            return f.read()
+
+    def convert_lines(self, function, **kwargs):
+        return "\n".join(function(line, **kwargs) for line in self.text.split("\n"))
+
+    def test_convert_file(self):
+        for processes in (1, 2):
+            hanzi.convert_file(
+                self.input_path, self.output_path, processes=processes, region_size=64
+            )
+            self.assertEqual(self.convert_lines(hanzi.to_pinyin), self.read_output())
+        hanzi.convert_file(
+            self.input_path, self.output_path, "zhuyin", sandhi=True, region_size=64
+        )
+        self.assertEqual(
+            self.convert_lines(hanzi.to_zhuyin, sandhi=True), self.read_output()
+        )
+        hanzi.convert_file(self.input_path, self.output_path, "numbered")
+        self.assertEqual(
+            self.convert_lines(hanzi.to_pinyin, accented=False), self.read_output()
+        )
+
+    def test_spawned_workers(self):
+        dictionary = os.path.join(self.tempdir.name, "user.tsv")
+        with open(dictionary, "w", encoding="utf-8") as f:
+            f.write("北京\tBěijìng\n")
+        script = (
+            "import multiprocessing, sys\n"
+            "from dragonmapper import hanzi\n"
+            "multiprocessing.set_start_method('spawn')\n"
+            "input_path, output_path, dictionary = sys.argv[1:]\n"
+            "hanzi.load_dictionary(dictionary)\n"
+            "hanzi.load_transcriptions()\n"
+            "hanzi.convert_file(input_path, output_path, 'zhuyin', processes=2,\n"
+            "                   region_size=64)\n"
+        )
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                script,
+                self.input_path,
+                self.output_path,
+                dictionary,
+            ],
+            check=True,
+        )
+        hanzi.load_dictionary(dictionary)
+        hanzi.load_transcriptions()
+        try:
+            expected = self.convert_lines(hanzi.to_zhuyin)
+        finally:
+            hanzi.unload_transcriptions()
+            hanzi.unload_dictionary(dictionary)
+        self.assertIn("hello world", expected)
+        self.assertIn("ㄅㄟˇ ㄐㄧㄥˋ", expected)
+        self.assertEqual(expected, self.read_output())
+
+    def test_regions(self):
+        data = self.text.encode("utf-8")
+        pattern = hanzi._file_split_pattern(" ", False)
+        regions = list(hanzi._file_regions(data, 64, pattern))
+        self.assertGreater(len(regions), 1)
+        self.assertEqual(0, regions[0][0])
+        self.assertEqual(len(data), regions[-1][1])
+        for (_, end), (start, _) in zip(regions, regions[1:]):
+            self.assertEqual(end, start)
+            self.assertIn(data[:end].decode("utf-8")[-1], " \n。，？")
+
+    def test_empty_file(self):
+        with open(self.input_path, "w"):
+            pass
+        hanzi.convert_file(self.input_path, self.output_path)
+        self.assertEqual("", self.read_output())
+        self.assertRaises(
+            ValueError,
+            hanzi.convert_file,
+            self.input_path,
+            self.output_path,
+            "wade-giles",
+        )
+
+
+class TestStoredTranscriptions(TestConversionFunctions):
+    def setUp(self):
+        hanzi.load_transcriptions()
+        self.addCleanup(hanzi.unload_transcriptions)
+
+    def test_zhuyin_and_ipa(self):
+        self.assertEqual(hanzi.to_zhuyin(self.chinese), self.zhuyin)
+        self.assertEqual(hanzi.to_ipa(self.chinese), self.ipa)
+        self.assertEqual(
+            hanzi.to_zhuyin(self.chinese, all_readings=True),
+            "[ㄞˋ][ㄒㄧˇ/ㄒㄧ/ㄔˋ][ㄏㄨㄢ˙/ㄏㄨㄢ][ㄞˋ]。",
+        )
+        self.assertIn("ㄞˋ", hanzi._TRANSCRIPTIONS["zhuyin"].values())
+
+    def test_untouched_text(self):
+        self.assertEqual("hello ㄋㄧˇ ㄏㄠˇ", hanzi.to_zhuyin("hello 你好"))
+        self.assertEqual("hello ni3hao3", hanzi.to_pinyin("hello 你好", accented=False))
+
+    def test_unknown_system(self):
+        self.assertRaises(ValueError, hanzi.load_transcriptions, ["wade-giles"])
+
+
+class TestCompactDictionaries(TestConversionFunctions):
+    @classmethod
+    def setUpClass(cls):
+        cls.original = dict(hanzi._HANZI_PINYIN_MAP)
+        hanzi.compact_dictionaries()
+
+    @classmethod
+    def tearDownClass(cls):
+        hanzi._replace_dictionaries(cls.original)
+
+    def test_packed_dictionary(self):
+        data = {"你好": ["nǐhǎo"], "你": ["nǐ"], "好": ["hǎo", "hào"], "𠀋": ["zhàng"]}
+        packed = hanzi._PackedDictionary(hanzi._PackedDictionary.pack(data))
+        self.assertEqual(data, dict(packed))
+        self.assertEqual(sorted(data), list(packed))
+        self.assertEqual(["hǎo", "hào"], packed["好"])
+        self.assertIsNone(packed.get("你们"))
+        self.assertNotIn("", packed)
+        self.assertRaises(KeyError, packed.__getitem__, "a")
+        self.assertEqual(
+            0, len(hanzi._PackedDictionary(hanzi._PackedDictionary.pack({})))
+        )
+
+    def test_prefix_queries(self):
+        words = hanzi._WORDS.maps[-1]
+        self.assertIsInstance(words, hanzi._PackedDictionary)
+        self.assertEqual(("喜歡", ["xǐhuan"]), words.longest_prefix("愛喜歡愛。", 1))
+        self.assertEqual((None, None), words.longest_prefix("愛喜歡愛。", 4))
+        self.assertEqual((None, None), words.longest_prefix("愛", 1))
+        self.assertEqual(
+            ("中华人民共和国", ["ZhōnghuáRénmínGònghéguó"]),
+            words.longest_prefix("中华人民共和国万岁"),
+        )
+        found = list(words.iter_prefix("喜歡"))
+        self.assertIn(("喜歡", ["xǐhuan"]), found)
+        self.assertEqual(sorted(found), found)
+        self.assertTrue(all(word.startswith("喜歡") for word, readings in found))
+        self.assertEqual(
+            sorted(word for word in self.original["words"] if word[0] == "喜"),
+            [word for word, readings in words.iter_prefix("喜")],
+        )
+
+    def test_share_dictionaries(self):
+        script = (
+            "import subprocess, sys\n"
+            "from dragonmapper import hanzi\n"
+            "hanzi.share_dictionaries()\n"
+            "print(hanzi.to_pinyin('愛喜歡愛。'))\n"
+            "child = ('from dragonmapper import hanzi; '\n"
+            "         'print(type(hanzi._WORDS.maps[0]).__name__); '\n"
+            "         'print(hanzi.to_zhuyin(\\'愛喜歡愛。\\'))')\n"
+            "sys.stdout.flush()\n"
+            "subprocess.run([sys.executable, '-c', child], check=True)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+        )
+        self.assertEqual(
+            [self.apinyin, "_PackedDictionary", self.zhuyin],
+            output.stdout.splitlines(),
+        )
+        self.assertEqual("", output.stderr)
+
+    def test_share_dictionaries_fork(self):
+        script = (
+            "import os, subprocess, sys\n"
+            "from dragonmapper import hanzi\n"
+            "hanzi.share_dictionaries()\n"
+            "pid = os.fork()\n"
+            "if pid == 0:\n"
+            "    sys.exit(0)\n"
+            "os.waitpid(pid, 0)\n"
+            "child = ('import warnings; warnings.simplefilter(\\'error\\'); '\n"
+            "         'from dragonmapper import hanzi; '\n"
+            "         'print(type(hanzi._WORDS.maps[0]).__name__)')\n"
+            "sys.stdout.flush()\n"
+            "subprocess.run([sys.executable, '-c', child], check=True)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+        )
+        self.assertEqual(["_PackedDictionary"], output.stdout.splitlines())
+        self.assertEqual("", output.stderr)
+
+    def test_missing_shared_dictionaries(self):
+        env = dict(os.environ, DRAGONMAPPER_SHARED_DICTIONARIES="dragonmapper_gone")
+        child = (
+            "from dragonmapper import hanzi; "
+            "print(type(hanzi._WORDS.maps[0]).__name__); "
+            "print(hanzi.to_zhuyin('愛喜歡愛。'))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", child],
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+            env=env,
+        )
+        self.assertEqual(["dict", self.zhuyin], output.stdout.splitlines())
+        self.assertIn("RuntimeWarning", output.stderr)
+
+
+class TestLinearTime(LinearTimeTestCase):
+    length = LinearTimeTestCase.length
+    inputs = LinearTimeTestCase.inputs + (
+        "你" * length,
+        "你 " * (length // 2),
+    )
+
+    def test_converters(self):
+        for function in (
+            hanzi.identify,
+            hanzi.to_pinyin,
+            hanzi.to_zhuyin,
+            hanzi.to_ipa,
+            hanzi.to_lattice,
+            functools.partial(hanzi.to_pinyin, sandhi=True),
+        ):
+            self.assert_linear(function)
+
+
+class TestAnalyze(unittest.TestCase):
+    def test_analyze(self):
+        counts = hanzi.analyze(["愛 喜歡 愛。", "长江很长abc"])
+        self.assertEqual(2, counts["texts"])
+        self.assertEqual(1, counts["words"])
+        self.assertEqual(2, counts["word_characters"])
+        self.assertEqual(6, counts["characters"])
+        self.assertEqual(2, counts["polyphonic"])
+        self.assertEqual(3, counts["unknown"])
+
+    def test_merge(self):
+        texts = ["愛 喜歡 愛。", "长江很长abc", "你好"]
+        counts = hanzi.analyze(texts[:1]) + hanzi.analyze(iter(texts[1:]))
+        self.assertEqual(hanzi.analyze(texts), counts)
+
+
+class TestUserDictionaries(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+    def _write_dictionary(self, filename, lines):
+        path = os.path.join(self.tempdir.name, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def _load_dictionary(self, path, name=None):
+        hanzi.load_dictionary(path, name=name)
+        self.addCleanup(hanzi.unload_dictionary, name or path)
+
+    def test_word_override(self):
+        path = self._write_dictionary("words.tsv", ["便宜\tbiànyí"])
+        self._load_dictionary(path)
+        self.assertEqual("biànyí", hanzi.to_pinyin("便宜"))
+        self.assertEqual("ㄅㄧㄢˋ ㄧˊ", hanzi.to_zhuyin("便宜"))
+
+    def test_character_override(self):
+        path = self._write_dictionary("characters.tsv", ["行\tháng/xíng"])
+        self._load_dictionary(path)
+        self.assertEqual("háng", hanzi.to_pinyin("行"))
+        self.assertEqual("[háng/xíng]", hanzi.to_pinyin("行", all_readings=True))
+
+    def test_new_word(self):
+        path = self._write_dictionary("words.tsv", ["龍圖\tlóngtú"])
+        self._load_dictionary(path)
+        self.assertEqual("lóngtú", hanzi.to_pinyin("龍圖"))
+
+    def test_new_character(self):
+        path = self._write_dictionary("characters.tsv", ["\u3007\tlíng"])
+        self._load_dictionary(path)
+        self.assertEqual("èrlínglíng", hanzi.to_pinyin("二\u3007\u3007"))
+
+    def test_disambiguate(self):
+        path = self._write_dictionary("characters.tsv", ["江\tjiāng/gāng", "长\tzhǎng"])
+        self._load_dictionary(path)
+        self.assertEqual("hěnzhǎngjiāng", hanzi.to_pinyin("很长江", disambiguate=True))
+        self.assertEqual(
+            ("江", ["jiāng", "gāng"]),
+            hanzi.to_lattice("很长江", disambiguate=True).segments()[2],
+        )
+
+    def test_priority(self):
+        first = self._write_dictionary("first.tsv", ["便宜\tbiànyí"])
+        second = self._write_dictionary("second.tsv", ["便宜\tpiányí"])
+        self._load_dictionary(first)
+        self._load_dictionary(second)
+        self.assertEqual("piányí", hanzi.to_pinyin("便宜"))
+
+    def test_reload(self):
+        path = self._write_dictionary("words.tsv", ["便宜\tbiànyí"])
+        self._load_dictionary(path, name="user")
+        self._write_dictionary("words.tsv", ["便宜\tpiányí"])
+        hanzi.load_dictionary(path, name="user")
+        self.assertEqual("piányí", hanzi.to_pinyin("便宜"))
+        self.assertEqual(2, len(hanzi._WORDS.maps))
+
+    def test_unload(self):
+        path = self._write_dictionary("words.tsv", ["便宜\tbiànyí"])
+        hanzi.load_dictionary(path)
+        hanzi.unload_dictionary(path)
+        self.assertEqual("piànyi", hanzi.to_pinyin("便宜"))
+        self.assertRaises(ValueError, hanzi.unload_dictionary, path)
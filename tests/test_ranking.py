@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for dragonmapper.ranking."""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from dragonmapper import hanzi, ranking
+
+
+class TestRanking(unittest.TestCase):
+    frequencies = [
+        "# Counts from a made-up corpus.",
+        "",
+        "了\tliao3\t5",
+        "了解\t30",
+        "还\thuán\t1",
+        "还是\thai2shi4\t100",
+        "便宜\tpián yi\t20",
+        "便宜\t1000",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = ranking.load_data()
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.frequency_list = os.path.join(self.tempdir.name, "frequencies.tsv")
+        with open(self.frequency_list, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.frequencies) + "\n")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def run_main(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            ranking.main([self.frequency_list] + list(args))
+        return output.getvalue()
+
+    def test_count_readings(self):
+        counts = ranking.count_readings(self.frequencies, self.data)
+        self.assertEqual(35, counts["了"]["liǎo"])
+        self.assertEqual(30, counts["了解"]["liǎojiě"])
+        self.assertEqual(100, counts["还"]["hái"])
+        self.assertEqual(1, counts["还"]["huán"])
+        self.assertEqual(20, counts["便"]["pián"])
+        self.assertRaises(ValueError, ranking.count_readings, ["了\tmany"], self.data)
+        self.assertRaises(ValueError, ranking.count_readings, ["a\tb\tc\t1"], self.data)
+
+    def test_rank_readings(self):
+        characters = self.data["hanzi_pinyin_characters.tsv"]
+        counts = ranking.count_readings(self.frequencies, self.data)
+        ranked, changed = ranking.rank_readings(self.data, counts)
+        ranked_characters = ranked["hanzi_pinyin_characters.tsv"]
+        self.assertEqual("liǎo", ranked_characters["了"][0])
+        self.assertEqual(sorted(characters["了"]), sorted(ranked_characters["了"]))
+        self.assertEqual(["hái", "huán"], ranked_characters["还"][:2])
+        self.assertEqual("pián", ranked_characters["便"][0])
+        self.assertIn("便", changed["hanzi_pinyin_characters.tsv"])
+        self.assertEqual(characters["啊"], ranked_characters["啊"])
+        self.assertNotIn("啊", changed["hanzi_pinyin_characters.tsv"])
+        self.assertEqual(list(characters), list(ranked_characters))
+
+    def test_dictionary(self):
+        path = os.path.join(self.tempdir.name, "ranked.tsv")
+        output = self.run_main("--dictionary", path)
+        self.assertIn("hanzi_pinyin_characters.tsv: ", output)
+        hanzi.load_dictionary(path, "ranked")
+        try:
+            self.assertEqual("pián", hanzi.to_pinyin("便"))
+            self.assertEqual(
+                "[pián/biàn/biān]", hanzi.to_pinyin("便", all_readings=True)
+            )
+        finally:
+            hanzi.unload_dictionary("ranked")
+        self.assertEqual("biàn", hanzi.to_pinyin("便"))
+
+    def test_output(self):
+        directory = os.path.join(self.tempdir.name, "data")
+        self.run_main("--output", directory)
+        data = ranking.load_data(directory)
+        self.assertEqual("pián", data["hanzi_pinyin_characters.tsv"]["便"][0])
+        self.assertEqual(
+            self.data["hanzi_pinyin_words.tsv"], data["hanzi_pinyin_words.tsv"]
+        )
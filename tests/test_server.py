@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for dragonmapper.server."""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dragonmapper import hanzi, server
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = server.Server()
+        self.listener = await self.server.start(port=0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await server._connect(port=self.port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+        await self.server.close()
+
+    async def test_request(self):
+        response = await server.request(self.reader, self.writer, "to_pinyin", "你好")
+        self.assertEqual({"id": None, "result": "nǐhǎo"}, response)
+        response = await server.request(
+            self.reader, self.writer, "to_zhuyin", "你好", sandhi=True
+        )
+        self.assertEqual(hanzi.to_zhuyin("你好", sandhi=True), response["result"])
+        response = await server.request(
+            self.reader, self.writer, "pinyin_to_ipa", "ni3hao3"
+        )
+        self.assertEqual("ni˧˩˧ xɑʊ˧˩˧", response["result"])
+
+    async def test_errors(self):
+        response = await server.request(self.reader, self.writer, "eval", "1")
+        self.assertIn("Unknown function", response["error"])
+        response = await server.request(
+            self.reader, self.writer, "to_pinyin", "你好", unknown=True
+        )
+        self.assertIn("unexpected keyword argument", response["error"])
+        response = await server.request(
+            self.reader, self.writer, "to_pinyin", "你好", offsets=True
+        )
+        self.assertIn("Unsupported options", response["error"])
+        self.writer.write(b"not json\n")
+        response = json.loads(await self.reader.readline())
+        self.assertIn("error", response)
+
+    async def test_malformed_requests(self):
+        messages = [
+            {"id": 1, "function": "to_pinyin", "text": ["x"]},
+            {"id": 2, "function": ["to_pinyin"], "text": "x"},
+            {"id": 3, "function": "to_pinyin", "text": "x", "options": "x"},
+            {"id": 4, "function": "to_pinyin", "text": "你好"},
+        ]
+        for message in messages:
+            self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+        responses = [json.loads(await self.reader.readline()) for _ in messages]
+        self.assertEqual([1, 2, 3, 4], [response["id"] for response in responses])
+        for response in responses[:3]:
+            self.assertIn("error", response)
+        self.assertEqual("nǐhǎo", responses[3]["result"])
+
+    def test_request_exception(self):
+        def broken(text):
+            raise KeyError(text)
+
+        requests = [
+            {"id": 1, "function": "to_pinyin", "text": "你好"},
+            {"id": 2, "function": "to_ipa", "text": "你好"},
+        ]
+        with mock.patch.dict(server.FUNCTIONS, to_ipa=broken):
+            responses = server._convert_batch(requests)
+        self.assertEqual({"id": 1, "result": "nǐhǎo"}, responses[0])
+        self.assertIn("Internal error", responses[1]["error"])
+
+    async def test_batch_exception(self):
+        with mock.patch.object(server, "_convert_batch", side_effect=RuntimeError):
+            response = await server.request(
+                self.reader, self.writer, "to_pinyin", "你好"
+            )
+        self.assertIn("Internal error", response["error"])
+        response = await server.request(self.reader, self.writer, "to_pinyin", "你好")
+        self.assertEqual("nǐhǎo", response["result"])
+
+    async def test_long_request(self):
+        text = "你好" * 20000
+        response = await server.request(self.reader, self.writer, "to_pinyin", text)
+        self.assertEqual("nǐhǎo" * 20000, response["result"])
+        self.writer.write(b"x" * (self.server.limit + 1) + b"\n")
+        response = json.loads(await self.reader.readline())
+        self.assertIn("at most", response["error"])
+        self.assertEqual(b"", await self.reader.readline())
+
+    async def test_close(self):
+        response = await server.request(self.reader, self.writer, "to_pinyin", "你好")
+        self.assertEqual("nǐhǎo", response["result"])
+        await self.server.close()
+        self.assertEqual(b"", await self.reader.readline())
+
+    async def test_batches(self):
+        texts = ["你好", "我住在美国。", "你好"] * 20
+        for i, text in enumerate(texts):
+            message = {"id": i, "function": "to_pinyin", "text": text}
+            self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+        for i, text in enumerate(texts):
+            response = json.loads(await self.reader.readline())
+            self.assertEqual({"id": i, "result": hanzi.to_pinyin(text)}, response)
+        stats = await server.request(self.reader, self.writer, "stats")
+        self.assertEqual(len(texts), stats["requests"])
+        self.assertLess(stats["batches"], len(texts))
+        self.assertIsNotNone(stats["latency_ms"]["p99"])
+
+    async def test_generate_load(self):
+        report = await server.generate_load(requests=200, concurrency=8, port=self.port)
+        self.assertEqual(200, report["requests"])
+        self.assertEqual(0, report["errors"])
+        self.assertEqual(200, report["server"]["requests"])
+        self.assertEqual(["p50", "p90", "p99", "max"], list(report["latency_ms"]))
+
+
+@unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "needs Unix sockets")
+class TestUnixServer(unittest.IsolatedAsyncioTestCase):
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "dragonmapper.sock")
+            conversion_server = server.Server()
+            listener = await conversion_server.start(path=path)
+            try:
+                report = await server.generate_load(
+                    requests=50, concurrency=4, function="to_ipa", path=path
+                )
+                self.assertEqual(0, report["errors"])
+            finally:
+                listener.close()
+                await listener.wait_closed()
+                await conversion_server.close()
+
+
+class TestPercentiles(unittest.TestCase):
+    def test_percentiles(self):
+        latencies = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(
+            {"p50": 50, "p90": 90, "p99": 99, "max": 100},
+            server.percentiles(latencies),
+        )
+        self.assertEqual(
+            {"p50": None, "p90": None, "p99": None, "max": None},
+            server.percentiles([]),
+        )
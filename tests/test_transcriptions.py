@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 """Unit tests for dragonmapper.transcriptions."""
 
+import functools
+import io
 import unittest
+from array import array
 
 from dragonmapper import transcriptions as trans
+from tests.timing import LinearTimeTestCase
 
 
 class TestIdentifyFunctions(unittest.TestCase):
@@ -41,6 +45,43 @@ class TestIdentifyFunctions(unittest.TestCase):
         self.assertFalse(trans.is_ipa(self.zhuyin))
         self.assertFalse(trans.is_ipa(self.unknown))
 
+    def test_validate(self):
+        self.assertEqual([], trans.validate_pinyin(self.numbered_pinyin))
+        self.assertEqual([], trans.validate_pinyin(self.accented_pinyin))
+        self.assertEqual(
+            [
+                (4, "lv4", "Not a valid syllable: lv4"),
+                (13, "zef", "Not a syllable: zef"),
+                (17, "Lve", "Not a valid syllable: Lve"),
+            ],
+            trans.validate_pinyin("ni3 lv4 hao3 zef Lve"),
+        )
+        self.assertEqual(
+            [(7, "xyz4", "Not a syllable: xyz4"), (17, "bla3", "Not a syllable: bla3")],
+            trans.validate_pinyin("zhong1 xyz4 guo2 bla3"),
+        )
+        self.assertEqual([], trans.validate_pinyin("Xi'an1, 2024 ni3hao3!"))
+        self.assertEqual(
+            [(0, "ㄝ", "Not a valid syllable: ㄝ")], trans.validate_zhuyin(self.zhuyin)
+        )
+        self.assertEqual([], trans.validate_ipa(self.ipa))
+        self.assertEqual(
+            [(6, "xxx", "Not a valid syllable: xxx")],
+            trans.validate_ipa("ni˧˩˧ xxx ɕi˥"),
+        )
+        self.assertEqual(
+            [(8, "ㄅ˙ㄅ", "Not a syllable: ㄅ˙ㄅ")],
+            trans.validate_zhuyin("ㄋㄧˇ ㄏㄠˇ ㄅ˙ㄅ"),
+        )
+        self.assertEqual(
+            [(6, "bxɑʊ˧˩˧", "Not a syllable: bxɑʊ˧˩˧")],
+            trans.validate_ipa("ni˧˩˧ bxɑʊ˧˩˧"),
+        )
+        self.assertEqual(
+            [(0, "ɕi˩", "Invalid tone: ˩"), (4, "ɕ˩", "Invalid tone: ˩")],
+            trans.validate_ipa("ɕi˩ ɕ˩"),
+        )
+
     def test_is_pinyin_compatible(self):
         self.assertFalse(trans.is_pinyin_compatible(self.ipa))
         self.assertTrue(trans.is_pinyin_compatible(self.numbered_pinyin))
@@ -104,6 +145,91 @@ class TestConvertFunctions(unittest.TestCase):
     def test_ipa_to_zhuyin(self):
         self.assertEqual(trans.ipa_to_zhuyin(self.ipa), self.zhuyin)
 
+    def test_writer(self):
+        for function, s, expected in (
+            (trans.numbered_to_accented, self.numbered_pinyin, self.accented_pinyin),
+            (trans.accented_to_numbered, self.accented_pinyin, self.numbered_pinyin),
+            (trans.pinyin_to_zhuyin, self.accented_pinyin, self.zhuyin),
+            (trans.pinyin_to_ipa, self.accented_pinyin, self.ipa),
+            (trans.zhuyin_to_ipa, self.zhuyin, self.ipa),
+            (trans.ipa_to_zhuyin, self.ipa, self.zhuyin),
+        ):
+            writer = io.StringIO()
+            self.assertIsNone(function(s, writer=writer))
+            self.assertEqual(expected, writer.getvalue())
+        writer = io.StringIO()
+        trans.zhuyin_to_pinyin(self.zhuyin, accented=False, writer=writer)
+        self.assertEqual(self.numbered_pinyin_spaced.lower(), writer.getvalue())
+        writer = io.StringIO()
+        trans.ipa_to_pinyin(self.ipa, writer=writer)
+        self.assertEqual(self.accented_pinyin_spaced.lower(), writer.getvalue())
+
+    def test_offsets(self):
+        self.assertEqual(
+            ("ㄒㄧ ㄢ ㄇㄚ˙", array("I", [0, 0, 0, 2, 3, 3, 3, 4, 5, 5, 8])),
+            trans.pinyin_to_zhuyin("xi1'an1 ma", offsets=True),
+        )
+        self.assertEqual(
+            ("guǎng'ér", array("I", [0, 0, 0, 0, 0, 0, 6, 6, 6, 8])),
+            trans.numbered_to_accented("guang3er2", offsets=True),
+        )
+        converted, offsets = trans.zhuyin_to_ipa(self.zhuyin, offsets=True)
+        self.assertEqual(self.ipa, converted)
+        self.assertEqual(len(self.zhuyin) + 1, len(offsets))
+        self.assertEqual(len(self.ipa), offsets[-1])
+
+    def test_errors(self):
+        pinyin = "ni3 lv4 hao3"
+        self.assertRaises(ValueError, trans.pinyin_to_zhuyin, pinyin)
+        self.assertEqual(
+            "ㄋㄧˇ lv4 ㄏㄠˇ", trans.pinyin_to_zhuyin(pinyin, errors="keep")
+        )
+        self.assertEqual(
+            "ㄋㄧˇ \ufffd ㄏㄠˇ", trans.pinyin_to_zhuyin(pinyin, errors="replace")
+        )
+        self.assertEqual(
+            "nǐ \ufffd xī", trans.ipa_to_pinyin("ni˧˩˧ xxx ɕi˥", errors="replace")
+        )
+        self.assertEqual(
+            ("ㄋㄧˇ xxx", array("I", [0, 0, 0, 0, 0, 3, 4, 4, 4, 7])),
+            trans.ipa_to_zhuyin("ni˧˩˧ xxx", errors="keep", offsets=True),
+        )
+        self.assertRaises(ValueError, trans.ipa_to_pinyin, "ɕi˩")
+        self.assertEqual(
+            "\ufffd \ufffd ㄋㄧˇ",
+            trans.pinyin_to_zhuyin("zef xyz4 ni3", errors="replace"),
+        )
+        self.assertEqual(
+            "zef xyz4 ㄋㄧˇ", trans.pinyin_to_zhuyin("zef xyz4 ni3", errors="keep")
+        )
+        self.assertEqual("nǐ ɕi˩", trans.ipa_to_pinyin("ni˧˩˧ ɕi˩", errors="keep"))
+        self.assertEqual(
+            "nǐ \ufffd", trans.ipa_to_pinyin("ni˧˩˧ ɕi˩", errors="replace")
+        )
+        self.assertRaises(ValueError, trans.pinyin_to_zhuyin, pinyin, errors="x")
+
+    def test_normalize_pinyin(self):
+        self.assertEqual(
+            "lü4 lü4 LÜ4 nü3", trans.normalize_pinyin("lv4 lu:4 LV4 nu：3")
+        )
+        self.assertEqual("nü3ren2", trans.normalize_pinyin("ｎｖ３ｒｅｎ２"))
+        self.assertEqual("lü4", trans.normalize_pinyin("lu\u03084"))
+        self.assertEqual("zhong1guo2", trans.normalize_pinyin("zho1ngguo2"))
+        self.assertEqual("kuang5hong3", trans.normalize_pinyin("kua5ngho3ng"))
+        self.assertEqual("ZHONG1 hao1", trans.normalize_pinyin("ZHO1NG ha1o"))
+        for s in ("ni3hao3", "ha1nan2", "hua1r5", "xi1'an1", "silver envy", "nǚ"):
+            self.assertEqual(s, trans.normalize_pinyin(s))
+
+    def test_normalize_pinyin_stream(self):
+        chunks = ["zho", "1ng lv", "4 ", "ha1o"]
+        self.assertEqual(
+            ["zhong1 ", "lü4 ", "hao1"], list(trans.normalize_pinyin_stream(chunks))
+        )
+        lines = io.StringIO("ni3 ha1o\nzho1ngguo2\n")
+        self.assertEqual(
+            "ni3 hao1\nzhong1guo2\n", "".join(trans.normalize_pinyin_stream(lines))
+        )
+
     def test_pinyin_middle_dot(self):
         self.assertEqual(trans.to_pinyin("\u00B7zi", accented=False), "zi5")
 
@@ -127,6 +253,16 @@ class TestConvertFunctions(unittest.TestCase):
         numbered = "An1"
         self.assertEqual(numbered, trans.accented_syllable_to_numbered(accented))
 
+    def test_syllable_case(self):
+        self.assertEqual("lǜ", trans.numbered_syllable_to_accented("lv4"))
+        self.assertEqual("LǛ", trans.numbered_syllable_to_accented("LV4"))
+        self.assertEqual("Zhōng", trans.numbered_syllable_to_accented("Zhong1"))
+        self.assertEqual("zHōNg", trans.numbered_syllable_to_accented("zHoNg1"))
+        self.assertEqual("zhong1", trans.accented_syllable_to_numbered("zhōng"))
+        self.assertEqual("ZHONG1", trans.accented_syllable_to_numbered("ZHŌNG"))
+        self.assertEqual("Zhong1", trans.accented_syllable_to_numbered("Zhōng"))
+        self.assertEqual("zHoNg1", trans.accented_syllable_to_numbered("zHōNg"))
+
     def test_issue_3(self):
         invalid_syllable = "zef"
         self.assertRaises(ValueError, trans.pinyin_syllable_to_zhuyin, invalid_syllable)
@@ -193,3 +329,45 @@ class TestConvertFunctions(unittest.TestCase):
         zhuyin = "ㄊㄟ"
 
         self.assertEqual(zhuyin, trans.pinyin_to_zhuyin(pinyin))
+
+
+class TestLinearTime(LinearTimeTestCase):
+    length = LinearTimeTestCase.length
+    inputs = LinearTimeTestCase.inputs + (
+        "zhuangzhuang" * (length // 12) + "x",
+        "nan" * (length // 3) + "!",
+        "ㄓㄨㄤ" * (length // 3) + "x",
+        "ʈʂ" * (length // 2) + "!",
+        "ɕi˩" * (length // 3),
+        "˩" * length,
+    )
+
+    def test_validators(self):
+        for function in (
+            trans.identify,
+            trans.is_pinyin,
+            trans.is_zhuyin,
+            trans.is_ipa,
+            trans.is_pinyin_compatible,
+            trans.validate_pinyin,
+            trans.validate_zhuyin,
+            trans.validate_ipa,
+        ):
+            self.assert_linear(function)
+
+    def test_converters(self):
+        for function in (
+            trans.numbered_to_accented,
+            trans.pinyin_to_zhuyin,
+            trans.zhuyin_to_ipa,
+            trans.ipa_to_pinyin,
+        ):
+            self.assert_linear(functools.partial(function, errors="keep"))
+        self.assert_linear(trans.normalize_pinyin)
+
+    def test_normalize_pinyin_stream(self):
+        def normalize(s):
+            return list(trans.normalize_pinyin_stream(iter(s)))
+
+        # One character per chunk, without any whitespace to split at.
+        self.assert_linear(normalize, ["ni3" * 10000])
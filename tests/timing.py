@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""A test case for checking that functions take linear time."""
+
+import timeit
+import unittest
+
+
+class LinearTimeTestCase(unittest.TestCase):
+    """Check that adversarial input doesn't take more than linear time.
+
+    Each function is timed on an input and on one four times as long. A
+    linear-time function takes about four times as long on the longer input
+    and a quadratic one about sixteen times as long. Subclasses add their
+    own inputs to :attr:`inputs`.
+
+    """
+
+    length = 2000
+    inputs = (
+        "a" * length,
+        "。" * length,
+        "(" * length,
+        "nǐhǎo" * (length // 5) + "q",
+    )
+
+    def assert_linear(self, function, inputs=None):
+        for s in self.inputs if inputs is None else inputs:
+            times = []
+            for text in (s, s * 4):
+                timer = timeit.Timer(lambda: function(text))
+                times.append(min(timer.repeat(number=1, repeat=3)))
+            self.assertLess(times[1], 10 * max(times[0], 1e-4), (function, s[:10]))